@@ -0,0 +1,289 @@
+'''
+Benchmark of the genetic algorithm hot paths against synthetic clusters.
+
+Working Details:
+1. A synthetic ClusterComponents is generated for every cluster size and the genetic algorithm
+   is set up with the simulated runner, so nothing leaves the process.
+2. Every stage prepares its inputs, then runs them once for timing and once more with tracemalloc
+   to record peak memory, so that tracing overhead doesn't affect the throughput.
+   Info logs of the benchmarked code are disabled while measuring.
+3. Results can be compared against a previous benchmark to flag throughput regressions.
+'''
+
+import gc
+import json
+import logging
+import os
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+import krkn_ai.constants as const
+from krkn_ai.algorithm.genetic import GeneticAlgorithm
+from krkn_ai.models.app import CommandRunResult, KrknRunnerType
+from krkn_ai.models.cluster_components import ClusterComponents, Container, Namespace, Node, Pod
+from krkn_ai.models.config import ConfigFile
+from krkn_ai.models.scenario.base import CompositeDependency, CompositeScenario
+from krkn_ai.models.scenario.factory import ScenarioFactory, scenario_specs
+from krkn_ai.models.scenario.genome import Genome, encode
+from krkn_ai.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+BENCHMARK_FILE = "benchmark.json"
+
+
+class BenchmarkResult(BaseModel):
+    stage: str
+    nodes: int
+    pods: int
+    operations: int
+    seconds: float
+    throughput: float   # Operations per second
+    peak_memory: int    # in bytes, peak of memory allocated while running the stage
+
+
+class Stage:
+    __slots__ = ("name", "setup", "operation", "scale")
+
+    def __init__(
+        self,
+        name: str,
+        setup: Callable[[int], List[Any]],
+        operation: Callable[[Any], Any],
+        scale: float = 1.0,
+    ):
+        self.name = name
+        self.setup = setup            # Creates inputs for the given number of operations
+        self.operation = operation    # Runs a single operation on one input
+        self.scale = scale            # Fraction of iterations to run, for slow stages
+
+
+def synthetic_cluster(nodes: int, pods: int, pods_per_namespace: int = 100) -> ClusterComponents:
+    '''Cluster with the given number of nodes and pods, spread across namespaces of equal size.'''
+    namespaces = []
+    for i in range(max(1, pods // pods_per_namespace)):
+        namespaces.append(Namespace(
+            name=f"namespace-{i}",
+            pods=[
+                Pod(
+                    name=f"pod-{i}-{j}",
+                    labels={"app": f"app-{j % 10}", "tier": f"tier-{j % 3}"},
+                    containers=[Container(name="app"), Container(name="sidecar")],
+                )
+                for j in range(min(pods_per_namespace, pods - i * pods_per_namespace))
+            ],
+        ))
+    return ClusterComponents(
+        namespaces=namespaces,
+        nodes=[
+            Node(
+                name=f"node-{i}",
+                labels={"kubernetes.io/hostname": f"node-{i}", "zone": f"zone-{i % 3}"},
+                free_cpu=8,
+                free_mem=32 * 1024 ** 3,
+                interfaces=["eth0"],
+            )
+            for i in range(nodes)
+        ],
+    )
+
+
+def benchmark_config(cluster_components: ClusterComponents, population_size: int) -> ConfigFile:
+    return ConfigFile(
+        kubeconfig_file_path="",
+        population_size=population_size,
+        composition_rate=0.3,
+        fitness_function={"query": "benchmark"},
+        health_checks={"applications": [{"name": "benchmark", "url": "http://benchmark"}]},
+        scenario={
+            attr: {"enable": True} for attr, _ in scenario_specs
+        },
+        cluster_components=cluster_components,
+    )
+
+
+class GABenchmark:
+    def __init__(
+        self,
+        output_dir: str,
+        iterations: int = const.BENCHMARK_ITERATIONS,
+        population_size: int = const.BENCHMARK_POPULATION_SIZE,
+    ):
+        self.output_dir = output_dir
+        self.iterations = iterations
+        self.population_size = population_size
+
+    def run(self, sizes: List[Tuple[int, int]]) -> List[BenchmarkResult]:
+        results = []
+        for nodes, pods in sizes:
+            logger.info("Benchmarking cluster with %d nodes and %d pods", nodes, pods)
+            cluster_components = synthetic_cluster(nodes, pods)
+            config = benchmark_config(cluster_components, self.population_size)
+
+            # Construction includes saving config, which serializes all cluster components
+            start = time.perf_counter()
+            ga = GeneticAlgorithm(
+                config,
+                output_dir=os.path.join(self.output_dir, f"cluster_{nodes}_{pods}"),
+                format="yaml",
+                runner_type=KrknRunnerType.SIMULATED_RUNNER,
+            )
+            seconds = time.perf_counter() - start
+            results.append(BenchmarkResult(
+                stage="init", nodes=nodes, pods=pods, operations=1,
+                seconds=seconds, throughput=1 / seconds, peak_memory=0,
+            ))
+            logger.info("%-22s %10.2f seconds", "init", seconds)
+
+            for stage in self.__stages(ga):
+                result = self.__measure(stage, nodes, pods)
+                logger.info(
+                    "%-22s %10.1f ops/s  peak %8.2f MiB",
+                    stage.name, result.throughput, result.peak_memory / 1024 ** 2
+                )
+                results.append(result)
+        return results
+
+    def save(self, results: List[BenchmarkResult]) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, BENCHMARK_FILE)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump([result.model_dump() for result in results], f, indent=2)
+        return path
+
+    def __measure(self, stage: Stage, nodes: int, pods: int) -> BenchmarkResult:
+        count = max(1, int(self.iterations * stage.scale))
+        logging.disable(logging.INFO)
+        try:
+            seconds, peak_memory = self.__run_stage(stage, count)
+        finally:
+            logging.disable(logging.NOTSET)
+
+        return BenchmarkResult(
+            stage=stage.name,
+            nodes=nodes,
+            pods=pods,
+            operations=count,
+            seconds=seconds,
+            throughput=count / seconds if seconds > 0 else float("inf"),
+            peak_memory=peak_memory,
+        )
+
+    def __run_stage(self, stage: Stage, count: int) -> Tuple[float, int]:
+        inputs = stage.setup(count)
+        gc.collect()
+        start = time.perf_counter()
+        for item in inputs:
+            stage.operation(item)
+        seconds = time.perf_counter() - start
+
+        # Second pass on fresh inputs, so that cached values (e.g. fingerprints) are not reused
+        inputs = stage.setup(count)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            for item in inputs:
+                stage.operation(item)
+            _, peak_memory = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return seconds, peak_memory
+
+    def __stages(self, ga: GeneticAlgorithm) -> List[Stage]:
+        config = ga.config
+        cluster_components = config.cluster_components
+
+        def scenarios(count: int):
+            return [ScenarioFactory.generate_random_scenario(config) for _ in range(count)]
+
+        def genomes(count: int) -> List[Genome]:
+            return [encode(scenario) for scenario in scenarios(count)]
+
+        def genome_pairs(count: int):
+            return list(zip(genomes(count), genomes(count)))
+
+        def composites(count: int):
+            return [
+                CompositeScenario(
+                    name="composite-scenario",
+                    scenario_a=a,
+                    scenario_b=b,
+                    dependency=CompositeDependency.A_ON_B,
+                )
+                for a, b in zip(scenarios(count), scenarios(count))
+            ]
+
+        def evaluated(count: int) -> List[CommandRunResult]:
+            return [ga.krkn_client.run(scenario, 0) for scenario in scenarios(count)]
+
+        # Results keyed by scenario, lookups are done with fresh genomes as when deduplicating offsprings
+        seen_population = {}
+
+        def lookups(count: int):
+            items = genomes(count)
+            for genome in items:
+                seen_population[genome.to_scenario(cluster_components)] = None
+            return [Genome(genome.type_id, genome.values) for genome in items]
+
+        def create_population(_):
+            ga.population = []
+            ga.create_population(self.population_size)
+
+        population = evaluated(self.population_size)
+        return [
+            Stage("create_population", lambda count: [None] * count, create_population, scale=0.1),
+            Stage("mutate", genomes, ga.mutate),
+            Stage("crossover", genome_pairs, lambda pair: ga.crossover(*pair)),
+            Stage("scenario_mutation", genomes, ga.scenario_mutation),
+            Stage(
+                "select_parents",
+                lambda count: [population] * count,
+                lambda results: ga.select_parents(results, len(results) // 2),
+            ),
+            Stage("seen_population", lookups, seen_population.__contains__),
+            Stage("expand_composite_json", composites, ga.krkn_client.graph_command),
+            Stage("evaluate", scenarios, lambda scenario: ga.krkn_client.run(scenario, 0)),
+            Stage("write_fitness_result", evaluated, ga.health_check_reporter.write_fitness_result),
+            Stage("plot_report", evaluated, ga.health_check_reporter.plot_report, scale=0.02),
+            Stage(
+                "save_best_generations",
+                lambda count: [population] * count,
+                ga.generations_reporter.save_best_generations,
+                scale=0.02,
+            ),
+        ]
+
+
+def compare(
+    results: List[BenchmarkResult],
+    baseline: List[BenchmarkResult],
+    tolerance: float = const.BENCHMARK_TOLERANCE,
+) -> List[str]:
+    '''
+    Stages whose throughput dropped by more than tolerance compared to the baseline.
+    '''
+    previous: Dict[Tuple[str, int, int], BenchmarkResult] = {
+        (x.stage, x.nodes, x.pods): x for x in baseline
+    }
+    regressions = []
+    for result in results:
+        before: Optional[BenchmarkResult] = previous.get((result.stage, result.nodes, result.pods))
+        if before is None or before.throughput <= 0:
+            continue
+        ratio = result.throughput / before.throughput
+        if ratio < 1 - tolerance:
+            regressions.append(
+                "%s (%d nodes, %d pods): %.1f ops/s, baseline %.1f ops/s (%.0f%%)" % (
+                    result.stage, result.nodes, result.pods,
+                    result.throughput, before.throughput, (ratio - 1) * 100
+                )
+            )
+    return regressions
+
+
+def load_results(path: str) -> List[BenchmarkResult]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [BenchmarkResult(**x) for x in json.load(f)]
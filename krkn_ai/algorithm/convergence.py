@@ -0,0 +1,71 @@
+'''
+Convergence detection of the genetic algorithm.
+
+After every generation the monitor checks whether the search still makes progress:
+1. Best fitness has not improved by more than min_improvement for patience generations.
+2. Ratio of unique scenarios in the generation dropped below min_diversity.
+3. Ratio of the generation served from already evaluated results exceeds max_cache_hit_rate.
+
+Any of them marks the population as converged, the genetic algorithm then either stops
+or replaces part of its population with random scenarios.
+'''
+
+from typing import Dict, List, Optional
+
+from krkn_ai.models.app import CommandRunResult
+from krkn_ai.models.config import ConvergenceConfig
+from krkn_ai.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ConvergenceMonitor:
+    def __init__(self, config: ConvergenceConfig):
+        self.config = config
+        self.best: Optional[float] = None   # Best fitness score so far
+        self.stale = 0      # Generations since best fitness last improved
+        self.restarts = 0   # Restarts of the population so far
+
+    def update(self, results: List[CommandRunResult], cache_hits: int) -> Optional[str]:
+        '''
+        Record results of a generation, of which cache_hits were already evaluated.
+        Returns the reason when the population has converged, otherwise None.
+        '''
+        if len(results) == 0:
+            return None
+
+        best = max(x.fitness_result.fitness_score for x in results)
+        if self.best is None or best > self.best + self.config.min_improvement:
+            self.stale = 0
+        else:
+            self.stale += 1
+        if self.best is None or best > self.best:
+            self.best = best
+
+        diversity = len(set(x.scenario for x in results)) / len(results)
+        cache_hit_rate = cache_hits / len(results)
+        logger.debug(
+            "Convergence: %d generations without improvement, diversity %.2f, cache hit rate %.2f",
+            self.stale, diversity, cache_hit_rate
+        )
+
+        if self.config.patience > 0 and self.stale >= self.config.patience:
+            return "best fitness %f did not improve for %d generations" % (self.best, self.stale)
+        if diversity < self.config.min_diversity:
+            return "only %.0f%% of the generation are unique scenarios" % (diversity * 100)
+        if cache_hit_rate > self.config.max_cache_hit_rate:
+            return "%.0f%% of the generation was already evaluated" % (cache_hit_rate * 100)
+        return None
+
+    def restart(self):
+        '''Population was restarted, give it patience generations to improve again.'''
+        self.restarts += 1
+        self.stale = 0
+
+    def get_state(self) -> Dict:
+        return {"best": self.best, "stale": self.stale, "restarts": self.restarts}
+
+    def set_state(self, state: Dict):
+        self.best = state["best"]
+        self.stale = state["stale"]
+        self.restarts = state["restarts"]
@@ -1,24 +1,44 @@
 import os
 import copy
+import math
 import json
+import pickle
+import tempfile
 import yaml
-from typing import List
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import List, Tuple
 
+import krkn_ai.constants as const
+import krkn_ai.models.app as app_models
+import krkn_ai.models.config as config_models
 from krkn_ai.models.app import CommandRunResult, KrknRunnerType
+from krkn_ai.algorithm.convergence import ConvergenceMonitor
+from krkn_ai.algorithm.pareto import ParetoRanking, objectives
+from krkn_ai.algorithm.selection import select_parent_pairs
+from krkn_ai.algorithm.surrogate import KNNSurrogate
 
 from krkn_ai.models.scenario.base import Scenario, BaseScenario, CompositeDependency, CompositeScenario
 from krkn_ai.models.scenario.factory import ScenarioFactory
+from krkn_ai.models.scenario.genome import AnyGenome, CompositeGenome, Genome, encode, layout_of
 
-from krkn_ai.models.config import ConfigFile
+from krkn_ai.models.config import ConfigFile, ConvergenceAction, EvolutionMode
 from krkn_ai.reporter.generations_reporter import GenerationsReporter
 from krkn_ai.reporter.health_check_reporter import HealthCheckReporter
 from krkn_ai.utils.logger import get_logger
 from krkn_ai.chaos_engines.krkn_runner import KrknRunner
+from krkn_ai.chaos_engines.simulated_runner import SimulatedKrknRunner
+from krkn_ai.utils.fitness_store import FitnessStore, cluster_fingerprint
+from krkn_ai.utils.cluster_manager import ClusterManager
+from krkn_ai.utils.cluster_watcher import ClusterWatcher
+from krkn_ai.utils import interrupt_commands_on_error
 from krkn_ai.utils.rng import rng
 from krkn_ai.models.custom_errors import PopulationSizeError
 
 logger = get_logger(__name__)
 
+CHECKPOINT_FILE = "checkpoint.pkl"
+CHECKPOINT_VERSION = 1
+
 
 class GeneticAlgorithm:
     '''
@@ -30,10 +50,17 @@ class GeneticAlgorithm:
         format: str,
         runner_type: KrknRunnerType = None
     ):
-        self.krkn_client = KrknRunner(
-            config,
-            output_dir=output_dir,
-            runner_type=runner_type
+        if runner_type == KrknRunnerType.SIMULATED_RUNNER:
+            self.krkn_client = SimulatedKrknRunner(config, output_dir=output_dir)
+        else:
+            self.krkn_client = KrknRunner(
+                config,
+                output_dir=output_dir,
+                runner_type=runner_type
+            )
+        # Writing per scenario reports takes much longer than a simulated run, skip them unless requested
+        self.report_scenarios = (
+            runner_type != KrknRunnerType.SIMULATED_RUNNER or config.simulator.report_scenarios
         )
         self.output_dir = output_dir
         self.config = config
@@ -41,8 +68,43 @@ class GeneticAlgorithm:
         self.format = format
 
         self.seen_population = {}  # Map between scenario and its result
+        self._search_space_size = None  # Estimated number of distinct non-composite scenarios
         self.best_of_generation = []
 
+        # Progress of the run, restored from checkpoint when resuming
+        self.resumed = False
+        self.start_generation = 0
+        self.completed_evaluations = 0  # Used in steady-state mode
+        self.evaluated_population: List[CommandRunResult] = []  # Used in steady-state and multi-objective mode
+        self.generation_results: List[CommandRunResult] = []    # Used in steady-state mode
+        self.generation_cache_hits = 0  # Members of the current generation served from already evaluated results
+        self.generation_new_scenarios = 0  # Members of the current generation not evaluated before
+        self.stale_generations = 0  # Consecutive generations without a new scenario
+
+        self.fitness_store = None
+        if self.config.fitness_cache.enable:
+            self.fitness_store = FitnessStore(
+                self.config.fitness_cache.path or os.path.join(self.output_dir, "fitness_cache.db"),
+                fingerprint=cluster_fingerprint(self.config, self.krkn_client.runner_type),
+                ttl=self.config.fitness_cache.ttl,
+            )
+
+        self.surrogate = None
+        if self.config.surrogate.enable:
+            self.surrogate = KNNSurrogate(self.config.surrogate)
+
+        self.convergence = None
+        if self.config.convergence.enable:
+            self.convergence = ConvergenceMonitor(self.config.convergence)
+
+        self.cluster_watcher = None
+        if self.config.cluster_watch.enable:
+            self.cluster_watcher = ClusterWatcher(
+                ClusterManager(self.config.kubeconfig_file_path),
+                self.config.cluster_watch,
+                self.config.cluster_components,
+            )
+
         self.health_check_reporter = HealthCheckReporter(self.output_dir)
         self.generations_reporter = GenerationsReporter(self.output_dir, self.format)
 
@@ -61,9 +123,25 @@ class GeneticAlgorithm:
         logger.debug("%s", json.dumps(self.config.model_dump(), indent=2))
 
     def simulate(self):
-        self.create_population(self.config.population_size)
+        if self.config.prepull_images:
+            self.krkn_client.prepull_images()
+        if self.cluster_watcher is not None:
+            self.cluster_watcher.start()
+        try:
+            if self.config.evolution_mode == EvolutionMode.steady_state:
+                self.simulate_steady_state()
+            else:
+                self.simulate_generational()
+        finally:
+            if self.cluster_watcher is not None:
+                self.cluster_watcher.stop()
+            self.krkn_client.close()
 
-        for i in range(self.config.generations):
+    def simulate_generational(self):
+        if not self.resumed:
+            self.create_population(self.config.population_size)
+
+        for i in range(self.start_generation, self.config.generations):
             if len(self.population) == 0:
                 logger.warning("No more population found, stopping generations.")
                 break
@@ -78,9 +156,7 @@ class GeneticAlgorithm:
             logger.info("--------------------------------------------------------")
 
             # Evaluate fitness of the current population
-            fitness_scores = [
-                self.calculate_fitness(member, i) for member in self.population
-            ]
+            fitness_scores = self.evaluate_population(self.population, i)
             # Find the best individual in the current generation
             # Note: If there is no best solution, it will still consider based on sorting order
             fitness_scores = sorted(
@@ -91,209 +167,532 @@ class GeneticAlgorithm:
 
             # We don't want to add a same parent back to population since its already been included
             for fitness_result in fitness_scores:
-                self.seen_population[fitness_result.scenario] = fitness_result
+                self.__add_seen(fitness_result)
+            self.__track_novelty()
 
-            # Repopulate off-springs
-            self.population = []
-            for _ in range(self.config.population_size // 2):
-                parent1, parent2 = self.select_parents(fitness_scores)
-                child1, child2 = None, None
-                if rng.random() < self.config.composition_rate:
-                    # componention crossover to generate 1 scenario
-                    child1 = self.composition(
-                        copy.deepcopy(parent1), copy.deepcopy(parent2)
-                    )
-                    child1 = self.mutate(child1)
-                    self.population.append(child1)
+            self.refresh_cluster_components()
 
-                    child2 = self.composition(
-                        copy.deepcopy(parent2), copy.deepcopy(parent1)
-                    )
-                    child2 = self.mutate(child2)
-                    self.population.append(child2)
-                else:
-                    # Crossover of 2 parents to generate 2 offsprings
-                    child1, child2 = self.crossover(
-                        copy.deepcopy(parent1), copy.deepcopy(parent2)
-                    )
-                    child1 = self.mutate(child1)
-                    child2 = self.mutate(child2)
+            # Parents and offsprings compete for a place in the parent population (NSGA-II elitism)
+            parents = fitness_scores
+            if self.config.multi_objective:
+                self.evaluated_population = self.__pareto_survivors(self.evaluated_population + fitness_scores)
+                parents = self.evaluated_population
 
-                    self.population.append(child1)
-                    self.population.append(child2)
+            # Repopulate off-springs
+            self.population = self.breed(parents, self.config.population_size)
 
             # Inject random members to population to diversify scenarios
             if rng.random() < self.config.population_injection_rate:
                 self.create_population(self.config.population_injection_size)
 
-    def create_population(self, population_size):
-        """Generate random population for algorithm"""
+            converged = self.check_convergence(fitness_scores)
+
+            self.start_generation = i + 1
+            self.save_checkpoint()
+            if converged:
+                break
+            if self.search_space_exhausted():
+                logger.warning("Search space is exhausted, stopping generations.")
+                break
+
+    def simulate_steady_state(self):
+        '''
+        Steady-state evolution: whenever an evaluation finishes, a new offspring is bred
+        from the current population so that evaluation slots never sit idle.
+
+        Every population_size completed evaluations are reported as one generation,
+        so best_of_generation stays comparable with the generational mode.
+        '''
+        population_size = self.config.population_size
+        max_parallel = self.config.max_parallel_scenarios
+        total_evaluations = self.config.generations * population_size
+
+        # self.population holds offsprings waiting to be evaluated
+        if not self.resumed:
+            self.create_population(population_size)
+        submitted = self.completed_evaluations
+
+        def on_result(result: CommandRunResult):
+            nonlocal total_evaluations
+            self.completed_evaluations += 1
+            self.__add_seen(result)
+            self.generation_results.append(result)
+
+            # Offspring replaces the weakest member once population is full
+            self.evaluated_population.append(result)
+            if self.config.multi_objective:
+                self.evaluated_population = self.__pareto_survivors(self.evaluated_population)
+            elif len(self.evaluated_population) > population_size:
+                weakest = min(self.evaluated_population, key=lambda x: x.fitness_result.fitness_score)
+                self.evaluated_population.remove(weakest)
+
+            if len(self.generation_results) == population_size:
+                generation_id = self.completed_evaluations // population_size
+                results, self.generation_results = self.generation_results, []
+                best = max(results, key=lambda x: x.fitness_result.fitness_score)
+                self.best_of_generation.append(best)
+                logger.info("| Generation %d |", generation_id)
+                logger.info("Best Fitness: %f", best.fitness_result.fitness_score)
+                self.__track_novelty()
+
+                self.refresh_cluster_components()
+
+                # Inject random members to population to diversify scenarios
+                if rng.random() < self.config.population_injection_rate:
+                    self.create_population(self.config.population_injection_size)
+
+                # Scenarios already submitted are still evaluated
+                if self.check_convergence(results):
+                    total_evaluations = submitted
+                elif self.search_space_exhausted():
+                    logger.warning("Search space is exhausted, stopping after the running scenarios.")
+                    total_evaluations = submitted
+
+        # Scenario commands may not get Ctrl+C, they are interrupted before waiting for the workers
+        with ThreadPoolExecutor(max_workers=max_parallel) as executor, interrupt_commands_on_error():
+            running = {}  # Map between future and scenario
+            while self.completed_evaluations < total_evaluations:
+                while len(running) < max_parallel and submitted < total_evaluations:
+                    if len(self.population) == 0:
+                        if len(self.evaluated_population) < 2:
+                            break
+                        self.population.extend(self.breed(self.evaluated_population, 2))
+
+                    idx = self.__next_runnable(self.population, running.values())
+                    if idx is None:
+                        break
+                    scenario = self.population.pop(idx)
+                    generation_id = submitted // population_size
+                    submitted += 1
+
+                    cached = self.__cached_fitness(scenario, generation_id)
+                    if cached is not None:
+                        on_result(cached)
+                        continue
+                    future = executor.submit(self.krkn_client.run, scenario, generation_id)
+                    running[future] = scenario
+
+                if len(running) == 0:
+                    if submitted >= total_evaluations or len(self.evaluated_population) >= 2:
+                        continue
+                    # Not enough evaluated parents to breed from
+                    if self.create_population(2) == 0:
+                        logger.warning("No new scenarios left to evaluate, stopping.")
+                        break
+                    continue
+
+                done, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    running.pop(future)
+                    result = future.result()
+                    self.__on_evaluated(result)
+                    on_result(result)
+
+                # Scenarios still running are evaluated again when resuming
+                self.save_checkpoint(pending=list(running.values()))
+
+    def breed(self, parents: List[CommandRunResult], count: int) -> List[BaseScenario]:
+        '''
+        Breed count offsprings from parents. When the surrogate model is enabled, more offsprings
+        are bred and only the most promising ones are kept for evaluation.
+        Offsprings are bred as genomes and only the selected ones are materialized into scenarios.
+        '''
+        candidates = count
+        screen = self.surrogate is not None and len(self.seen_population) >= self.config.surrogate.min_samples
+        if screen:
+            candidates = count * self.config.surrogate.oversampling
+
+        offsprings = []
+        for parent1, parent2 in self.select_parents(parents, math.ceil(candidates / 2)):
+            offsprings.extend(self.reproduce(parent1, parent2))
+        offsprings = self.ensure_novelty(offsprings)
+        if screen:
+            offsprings = self.surrogate.screen(offsprings, count, self.seen_population)
+        return [offspring.to_scenario(self.config.cluster_components) for offspring in offsprings]
+
+    def ensure_novelty(self, offsprings: List[AnyGenome]) -> List[AnyGenome]:
+        '''
+        Re-mutate offsprings which were already evaluated, or are already waiting for evaluation,
+        up to config.novelty_retries times. Offsprings that stay duplicates are kept as they are.
+        '''
+        if self.config.novelty_retries <= 0 or self.search_space_exhausted():
+            return offsprings
+
+        # Genomes compare equal to the scenarios they materialize into
+        taken = set(self.population)
+        result = []
+        duplicates = 0
+        for offspring in offsprings:
+            retries = 0
+            while (offspring in self.seen_population or offspring in taken) and \
+                    retries < self.config.novelty_retries:
+                offspring = self.mutate(offspring)
+                retries += 1
+            if offspring in self.seen_population or offspring in taken:
+                duplicates += 1
+            taken.add(offspring)
+            result.append(offspring)
+
+        if duplicates > 0:
+            logger.debug(
+                "%d of %d offsprings are still duplicates after %d re-mutations",
+                duplicates, len(offsprings), self.config.novelty_retries
+            )
+        return result
+
+    @property
+    def search_space_size(self) -> float:
+        '''Estimated number of distinct non-composite scenarios for the current cluster components.'''
+        if self._search_space_size is None:
+            self._search_space_size = ScenarioFactory.search_space_size(self.config)
+            logger.debug("Estimated search space size: %s", self._search_space_size)
+        return self._search_space_size
+
+    def search_space_exhausted(self) -> bool:
+        '''
+        Whether all scenarios of the search space have been evaluated.
+
+        The estimated size is an upper bound, parameters that depend on each other or on the
+        cluster can make it unreachable. The search space is therefore also exhausted once
+        novelty_retries consecutive generations did not produce any new scenario. Composite
+        scenarios can always be combined into new ones, so the size is only used without composition.
+        '''
+        if self.config.novelty_retries > 0 and self.stale_generations >= self.config.novelty_retries:
+            return True
+        if self.config.composition_rate > 0:
+            return False
+        return len(self.seen_population) >= self.search_space_size
+
+    def __add_seen(self, result: CommandRunResult):
+        if result.scenario not in self.seen_population:
+            self.generation_new_scenarios += 1
+        self.seen_population[result.scenario] = result
+
+    def __track_novelty(self):
+        '''Update the number of consecutive generations without a new scenario.'''
+        new_scenarios, self.generation_new_scenarios = self.generation_new_scenarios, 0
+        if new_scenarios > 0:
+            self.stale_generations = 0
+        else:
+            self.stale_generations += 1
+            logger.info("No new scenario evaluated for %d generations", self.stale_generations)
+
+    def check_convergence(self, results: List[CommandRunResult]) -> bool:
+        '''
+        Update convergence criteria with the results of a generation. Returns True when the run
+        should stop, a converged population is otherwise partly replaced with random scenarios.
+        '''
+        cache_hits, self.generation_cache_hits = self.generation_cache_hits, 0
+        if self.convergence is None:
+            return False
+        reason = self.convergence.update(results, cache_hits)
+        if reason is None:
+            return False
+
+        config = self.config.convergence
+        if config.action == ConvergenceAction.stop or self.convergence.restarts >= config.max_restarts:
+            logger.info("Population converged (%s), stopping the run.", reason)
+            return True
+
+        count = max(1, round(config.restart_rate * self.config.population_size))
+        logger.info("Population converged (%s), restarting %d members with random scenarios.", reason, count)
+        del self.population[max(0, len(self.population) - count):]
+        self.create_population(count)
+        self.convergence.restart()
+        return False
+
+    def reproduce(self, parent1: BaseScenario, parent2: BaseScenario) -> List[AnyGenome]:
+        '''
+        Breed two offsprings from parents using composition or crossover, followed by mutation.
+        Breeding works on genomes, parents are never copied or modified.
+        '''
+        genome1, genome2 = encode(parent1), encode(parent2)
+        if rng.random() < self.config.composition_rate:
+            # componention crossover to generate 1 scenario
+            child1 = self.composition(genome1, genome2)
+            child2 = self.composition(genome2, genome1)
+        else:
+            # Crossover of 2 parents to generate 2 offsprings
+            child1, child2 = self.crossover(genome1, genome2)
+        return [self.mutate(child1), self.mutate(child2)]
+
+    def refresh_cluster_components(self):
+        '''
+        Update cluster components with the latest state from the cluster watcher,
+        so that new scenarios are not generated against components that no longer exist.
+        '''
+        if self.cluster_watcher is None:
+            return
+        components = self.cluster_watcher.snapshot()
+        if components is self.config.cluster_components:
+            return
+        self.config.cluster_components = components
+        self._search_space_size = None
+        for scenario in self.population:
+            self.__attach_cluster_components(scenario)
+        logger.info(
+            "Refreshed cluster components: %d namespaces, %d pods, %d nodes",
+            len(components.namespaces),
+            sum(len(ns.pods) for ns in components.namespaces),
+            len(components.nodes)
+        )
+
+    def create_population(self, population_size) -> int:
+        """
+        Generate random population for algorithm, returns the number of scenarios added.
+        Scenarios which were already evaluated or are already in the population are skipped,
+        fewer scenarios are added when the search space doesn't have enough new ones.
+        """
         logger.info("Creating random population")
         logger.info("Population Size: %d", self.config.population_size)
 
-        already_seen = set()
+        already_seen = set(self.population)
+        # Search space size only covers non-composite scenarios, which are the only ones created here
+        taken = sum(isinstance(x, Scenario) for x in self.seen_population)
+        taken += sum(isinstance(x, Scenario) and x not in self.seen_population for x in already_seen)
+        available = self.search_space_size - taken
+        if available < population_size:
+            logger.warning(
+                "Search space has about %d scenarios left to evaluate, creating at most %d of %d random scenarios.",
+                max(0, available), max(0, available), population_size
+            )
+            population_size = max(0, int(available))
+
+        # Random draws are bounded, since the estimate might be larger than the actual search space
+        attempts = population_size * const.POPULATION_MAX_ATTEMPTS
         count = 0
-        while count != population_size:
+        while count < population_size and attempts > 0:
+            attempts -= 1
             scenario = ScenarioFactory.generate_random_scenario(self.config)
-            if scenario and scenario not in already_seen:
+            if scenario and scenario not in already_seen and scenario not in self.seen_population:
                 self.population.append(scenario)
                 already_seen.add(scenario)
                 count += 1
+        if count < population_size:
+            logger.warning("Only %d of %d random scenarios are new, search space is nearly exhausted.", count, population_size)
+        return count
+
+
+    def evaluate_population(self, population: List[BaseScenario], generation_id: int) -> List[CommandRunResult]:
+        '''
+        Evaluate fitness of all members of a population.
 
+        Up to config.max_parallel_scenarios scenarios are run at the same time. Scenarios
+        disrupting overlapping namespaces or nodes are never run together so that
+        fitness can still be attributed to a single scenario.
+        '''
+        max_parallel = self.config.max_parallel_scenarios
+        if max_parallel <= 1 or len(population) <= 1:
+            return [self.calculate_fitness(member, generation_id) for member in population]
+
+        logger.debug("Evaluating %d scenarios with up to %d in parallel", len(population), max_parallel)
+        results = [None] * len(population)
+        pending = []
+        for idx, member in enumerate(population):
+            results[idx] = self.__cached_fitness(member, generation_id)
+            if results[idx] is None:
+                pending.append(idx)
+
+        # Scenario commands may not get Ctrl+C, they are interrupted before waiting for the workers
+        with ThreadPoolExecutor(max_workers=max_parallel) as executor, interrupt_commands_on_error():
+            running = {}  # Map between future and population index
+            while len(pending) > 0 or len(running) > 0:
+                while len(running) < max_parallel:
+                    next_idx = self.__next_runnable(
+                        [population[idx] for idx in pending],
+                        [population[idx] for idx in running.values()]
+                    )
+                    if next_idx is None:
+                        break
+                    idx = pending.pop(next_idx)
+                    future = executor.submit(self.krkn_client.run, population[idx], generation_id)
+                    running[future] = idx
+
+                done, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    idx = running.pop(future)
+                    # Reports are written from the main thread only
+                    results[idx] = future.result()
+                    self.__on_evaluated(results[idx])
+        return results
+
+    def __next_runnable(self, candidates: List[BaseScenario], running: List[BaseScenario]):
+        '''
+        Index of the first candidate that does not disrupt the same
+        namespaces or nodes as any running scenario.
+        '''
+        running = list(running)
+        for idx, candidate in enumerate(candidates):
+            if not any(candidate.conflicts_with(x) for x in running):
+                return idx
+        return None
 
     def calculate_fitness(self, scenario: BaseScenario, generation_id: int):
+        cached = self.__cached_fitness(scenario, generation_id)
+        if cached is not None:
+            return cached
+        scenario_result = self.krkn_client.run(scenario, generation_id)
+        self.__on_evaluated(scenario_result)
+        return scenario_result
+
+    def __cached_fitness(self, scenario: BaseScenario, generation_id: int):
+        '''
+        Fetch result of a scenario that has already been evaluated in this run,
+        or in a previous run through the fitness store.
+        '''
         # If scenario has already been run, do not run it again.
         # we will rely on mutation for the same parents to produce newer samples
         if scenario in self.seen_population:
             logger.info("Scenario %s already evaluated, skipping fitness calculation.", scenario)
+            self.generation_cache_hits += 1
             scenario = copy.deepcopy(self.seen_population[scenario])
             scenario.generation_id = generation_id
             return scenario
-        scenario_result = self.krkn_client.run(scenario, generation_id)
+        if self.fitness_store is not None:
+            scenario_result = self.fitness_store.get(scenario, generation_id)
+            if scenario_result is not None:
+                logger.info("Scenario %s found in fitness store, skipping fitness calculation.", scenario)
+                self.generation_cache_hits += 1
+                self.__report_result(scenario_result)
+                return scenario_result
+        return None
+
+    def __on_evaluated(self, scenario_result: CommandRunResult):
+        # Fitness of a truncated run is measured over a shorter window, it is not reused by later runs
+        if self.fitness_store is not None and not scenario_result.truncated:
+            self.fitness_store.put(scenario_result)
+        self.__report_result(scenario_result)
+
+    def __report_result(self, scenario_result: CommandRunResult):
+        if not self.report_scenarios:
+            return
         # Save scenario result
         self.save_scenario_result(scenario_result)
         self.health_check_reporter.plot_report(scenario_result)
         self.health_check_reporter.write_fitness_result(scenario_result)
-        return scenario_result
 
-    def mutate(self, scenario: BaseScenario):
-        if isinstance(scenario, CompositeScenario):
-            scenario.scenario_a = self.mutate(scenario.scenario_a)
-            scenario.scenario_b = self.mutate(scenario.scenario_b)
-            return scenario
-        
+    def mutate(self, genome: AnyGenome) -> AnyGenome:
+        '''
+        Mutate a genome against the current cluster components.
+        '''
+        cluster_components = self.config.cluster_components
+        if isinstance(genome, CompositeGenome):
+            return CompositeGenome(
+                genome.name,
+                genome.dependency,
+                self.mutate(genome.genome_a),
+                self.mutate(genome.genome_b),
+            )
+
         # Scenario mutation (new scenario, try to preserve properties)
         if rng.random() < self.config.scenario_mutation_rate:
-            success, new_scenario = self.scenario_mutation(scenario)
+            success, new_genome = self.scenario_mutation(genome)
             if success:
                 # logger.debug("Scenario mutation successful")
-                return new_scenario
+                # Values inherited from parents may target components removed by a cluster refresh
+                if hasattr(new_genome.layout.scenario_cls, "mutate") and \
+                        not new_genome.targets_exist(cluster_components):
+                    new_genome = new_genome.mutate(cluster_components)
+                return new_genome
 
         # Parameter mutation (current scenario, try to change properties)
-        if hasattr(scenario, "mutate"):
-            scenario.mutate()
-        else:
-            logger.warning("Scenario %s does not have mutate method", scenario)
-        return scenario
+        if hasattr(genome.layout.scenario_cls, "mutate"):
+            return genome.mutate(cluster_components)
+        logger.warning("Scenario %s does not have mutate method", genome.name)
+        return genome
 
-    def scenario_mutation(self, scenario: BaseScenario):
+    def scenario_mutation(self, genome: Genome) -> Tuple[bool, Genome]:
         '''
         Create a new scenario of different type while trying to preserve properties.
         '''
-        possible_scenarios = ScenarioFactory.list_scenarios(self.config)
-
-        # check scenarios for common parameters
-        common_scenarios = []
-        for _, scenario_cls in possible_scenarios:
-            # instantiate new scenario for a scenario type
-            new_scenario = scenario_cls(cluster_components=self.config.cluster_components)
-
-            common_params = set([x.name for x in new_scenario.parameters]) & set(
-                [x.name for x in scenario.parameters]
-            )
-            # Do not consider the same scenario type for scenario mutation
-            if len(common_params) > 0 and type(new_scenario) != type(scenario):
-                common_scenarios.append(new_scenario)
+        layout = genome.layout
+
+        # Only scenario types sharing parameters are considered, based on their layouts
+        # Do not consider the same scenario type for scenario mutation
+        common_scenarios = [
+            scenario_cls for _, scenario_cls in ScenarioFactory.list_scenarios(self.config)
+            if scenario_cls is not layout.scenario_cls
+            and len(layout_of(scenario_cls).compatible_parameters(layout)) > 0
+        ]
         if len(common_scenarios) == 0:
             logger.debug("No common scenarios found, returning original scenario")
-            return False, scenario
+            return False, genome
 
         # create a new scenario with the same parameters
-        new_scenario = rng.choice(common_scenarios)
-
-        # Identify common parameters and set them to the new scenario
-        common_params = set([x.name for x in new_scenario.parameters]) & set([x.name for x in scenario.parameters])
-        for param in common_params:
-            # Get parameter value from original scenario
-            param_value = self.__get_param_value(scenario, param)
-
-            # Set parameter value for new scenario
-            self.__set_param_value(new_scenario, param, param_value)
+        scenario_cls = rng.pick(common_scenarios)
+        new_genome = Genome.from_scenario(scenario_cls(cluster_components=self.config.cluster_components))
 
-        return True, new_scenario
+        # Set common parameter values from original scenario
+        common_params = new_genome.layout.compatible_parameters(layout)
+        return True, new_genome.replace({param: genome.get(param) for param in common_params})
 
 
-    def select_parents(self, fitness_scores: List[CommandRunResult]):
+    def select_parents(self, fitness_scores: List[CommandRunResult], pairs: int = 1) -> List[Tuple[BaseScenario, BaseScenario]]:
         """
-        Selects two parents using Roulette Wheel Selection (proportionate selection).
+        Selects pairs of parents with the configured selection strategy.
         Higher fitness means higher chance of being selected.
+        In multi-objective mode parents are selected by crowded tournament over Pareto ranks.
         """
-        total_fitness = sum([x.fitness_result.fitness_score for x in fitness_scores])
-
-        scenarios = [x.scenario for x in fitness_scores]
-
-        if total_fitness == 0:  # Handle case where all fitness scores are zero
-            return rng.choice(scenarios), rng.choice(scenarios)
-
-        # Normalize fitness scores to get probabilities
-        probabilities = [x.fitness_result.fitness_score / total_fitness for x in fitness_scores]
+        if self.config.multi_objective:
+            return ParetoRanking(fitness_scores, self.config).select(pairs)
+        return select_parent_pairs(
+            [x.scenario for x in fitness_scores],
+            [x.fitness_result.fitness_score for x in fitness_scores],
+            pairs,
+            self.config.selection,
+        )
 
-        # Select parents based on probabilities
-        parent1 = rng.choices(items=scenarios, weights=probabilities, k=1)[0]
-        parent2 = rng.choices(items=scenarios, weights=probabilities, k=1)[0]
-        return parent1, parent2
+    def __pareto_survivors(self, results: List[CommandRunResult]) -> List[CommandRunResult]:
+        # Same scenario can be evaluated again when cached, keep a single result per scenario
+        unique = list({x.scenario: x for x in results}.values())
+        return ParetoRanking(unique, self.config).survivors(self.config.population_size)
 
-    def crossover(self, scenario_a: BaseScenario, scenario_b: BaseScenario):
-        if isinstance(scenario_a, CompositeScenario) and isinstance(scenario_b, CompositeScenario):
+    def crossover(self, genome_a: AnyGenome, genome_b: AnyGenome) -> Tuple[AnyGenome, AnyGenome]:
+        if isinstance(genome_a, CompositeGenome) and isinstance(genome_b, CompositeGenome):
             # Handle both scenario are composite
             # by swapping one of the branches
-            scenario_a.scenario_b, scenario_b.scenario_b = scenario_b.scenario_b, scenario_a.scenario_b
-            return scenario_a, scenario_b
-        elif isinstance(scenario_a, CompositeScenario) or isinstance(scenario_b, CompositeScenario):
-            # Only one of them is composite
-            if isinstance(scenario_a, CompositeScenario):
-                # Scenario A is composite and B is not
-                # Swap scenario_a's right node with scenario_b
-                a_b = scenario_a.scenario_b
-                scenario_a.scenario_b = scenario_b
-                return scenario_a, a_b
-            else:
-                # Scenario B is composite and A is not
-                # Swap scenario_a's right node with scenario_b
-                b_a = scenario_b.scenario_a
-                scenario_b.scenario_a = scenario_a
-                return b_a, scenario_b
-
-        if not hasattr(scenario_a, "parameters") or not hasattr(scenario_b, "parameters"):
-            logger.warning("Scenario %s or %s does not have property 'parameters'", scenario_a, scenario_b)
-            return scenario_a, scenario_b
-
-        common_params = set([x.name for x in scenario_a.parameters]) & set(
-            [x.name for x in scenario_b.parameters]
-        )
+            return (
+                CompositeGenome(genome_a.name, genome_a.dependency, genome_a.genome_a, genome_b.genome_b),
+                CompositeGenome(genome_b.name, genome_b.dependency, genome_b.genome_a, genome_a.genome_b),
+            )
+        elif isinstance(genome_a, CompositeGenome):
+            # Scenario A is composite and B is not
+            # Swap scenario_a's right node with scenario_b
+            return (
+                CompositeGenome(genome_a.name, genome_a.dependency, genome_a.genome_a, genome_b),
+                genome_a.genome_b,
+            )
+        elif isinstance(genome_b, CompositeGenome):
+            # Scenario B is composite and A is not
+            # Swap scenario_b's left node with scenario_a
+            return (
+                genome_b.genome_a,
+                CompositeGenome(genome_b.name, genome_b.dependency, genome_a, genome_b.genome_b),
+            )
+
+        common_params = genome_a.layout.compatible_parameters(genome_b.layout)
 
         if len(common_params) == 0:
             # no common parameter, currenty we return parents as is and hope for mutation
             # adopt some different strategy
-            return scenario_a, scenario_b
-        else:
-            # if there are common params, lets switch values between them
-            for param in common_params:
-                if rng.random() < self.config.crossover_rate:
-                    # find index of param in list
-                    a_value = self.__get_param_value(scenario_a, param)
-                    b_value = self.__get_param_value(scenario_b, param)
+            return genome_a, genome_b
 
-                    # swap param values
-                    self.__set_param_value(scenario_a, param, b_value)
-                    self.__set_param_value(scenario_b, param, a_value)
-
-            return scenario_a, scenario_b
+        # if there are common params, lets switch values between them
+        a_changes, b_changes = {}, {}
+        for param in common_params:
+            if rng.random() < self.config.crossover_rate:
+                a_changes[param] = genome_b.get(param)
+                b_changes[param] = genome_a.get(param)
+        return genome_a.replace(a_changes), genome_b.replace(b_changes)
 
-    def composition(self, scenario_a: BaseScenario, scenario_b: BaseScenario):
+    def composition(self, genome_a: AnyGenome, genome_b: AnyGenome) -> CompositeGenome:
         # combines two scenario to create a single composite scenario
         dependency = rng.choice([
             CompositeDependency.NONE,
             CompositeDependency.A_ON_B,
             CompositeDependency.B_ON_A
         ])
-        composite_scenario = CompositeScenario(
-            name="composite",
-            scenario_a=scenario_a,
-            scenario_b=scenario_b,
-            dependency=dependency
-        )
-        return composite_scenario
+        return CompositeGenome("composite", dependency, genome_a, genome_b)
 
     def save(self):
         '''Save run results'''
@@ -302,6 +701,95 @@ class GeneticAlgorithm:
         self.generations_reporter.save_best_generation_graph(self.best_of_generation)
         self.health_check_reporter.save_report(self.seen_population.values())
         self.health_check_reporter.sort_fitness_result_csv()
+        if self.config.multi_objective and len(self.seen_population) > 0:
+            front = ParetoRanking(list(self.seen_population.values()), self.config).front()
+            self.generations_reporter.save_pareto_front(front, objectives(self.config), self.config)
+
+    def save_checkpoint(self, pending: List[BaseScenario] = None):
+        '''
+        Atomically save the state of the run so that it can be resumed later.
+        '''
+        state = {
+            "version": CHECKPOINT_VERSION,
+            "evolution_mode": self.config.evolution_mode,
+            "start_generation": self.start_generation,
+            "completed_evaluations": self.completed_evaluations,
+            "population": (pending or []) + self.population,
+            "seen_population": list(self.seen_population.values()),
+            "best_of_generation": self.best_of_generation,
+            "evaluated_population": self.evaluated_population,
+            "generation_results": self.generation_results,
+            "generation_cache_hits": self.generation_cache_hits,
+            "generation_new_scenarios": self.generation_new_scenarios,
+            "stale_generations": self.stale_generations,
+            "convergence": self.convergence.get_state() if self.convergence is not None else None,
+            "rng_state": rng.get_state(),
+            "scenario_auto_id": app_models.auto_id.get_state(),
+            "fitness_auto_id": config_models.auto_id.get_state(),
+        }
+        checkpoint_path = os.path.join(self.output_dir, CHECKPOINT_FILE)
+        fd, tmp_path = tempfile.mkstemp(dir=self.output_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(state, f)
+            os.replace(tmp_path, checkpoint_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        logger.debug("Saved checkpoint to %s", checkpoint_path)
+
+    def load_checkpoint(self):
+        '''
+        Restore state of a previous run from the checkpoint in output directory.
+        '''
+        checkpoint_path = os.path.join(self.output_dir, CHECKPOINT_FILE)
+        if not os.path.exists(checkpoint_path):
+            raise FileNotFoundError(f"No checkpoint found in {self.output_dir}")
+
+        with open(checkpoint_path, "rb") as f:
+            state = pickle.load(f)
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError(f"Unsupported checkpoint version: {state.get('version')}")
+        if state["evolution_mode"] != self.config.evolution_mode:
+            raise ValueError(
+                f"Checkpoint was created with evolution mode '{state['evolution_mode'].value}'"
+            )
+
+        # Point scenarios to the cluster components of the current config
+        results = state["seen_population"] + state["best_of_generation"] + \
+            state["evaluated_population"] + state["generation_results"]
+        for scenario in state["population"] + [x.scenario for x in results]:
+            self.__attach_cluster_components(scenario)
+
+        self.start_generation = state["start_generation"]
+        self.completed_evaluations = state["completed_evaluations"]
+        self.population = state["population"]
+        self.seen_population = {x.scenario: x for x in state["seen_population"]}
+        self.best_of_generation = state["best_of_generation"]
+        self.evaluated_population = state["evaluated_population"]
+        self.generation_results = state["generation_results"]
+        self.generation_cache_hits = state.get("generation_cache_hits", 0)
+        self.generation_new_scenarios = state.get("generation_new_scenarios", 0)
+        self.stale_generations = state.get("stale_generations", 0)
+        if self.convergence is not None and state.get("convergence") is not None:
+            self.convergence.set_state(state["convergence"])
+        rng.set_state(state["rng_state"])
+        app_models.auto_id.set_state(state["scenario_auto_id"])
+        config_models.auto_id.set_state(state["fitness_auto_id"])
+        self.resumed = True
+
+        logger.info(
+            "Resuming from checkpoint: %d generations completed, %d scenarios evaluated",
+            len(self.best_of_generation), len(self.seen_population)
+        )
+
+    def __attach_cluster_components(self, scenario: BaseScenario):
+        if isinstance(scenario, CompositeScenario):
+            self.__attach_cluster_components(scenario.scenario_a)
+            self.__attach_cluster_components(scenario.scenario_b)
+        elif isinstance(scenario, Scenario):
+            scenario._cluster_components = self.config.cluster_components
 
     def save_config(self):
         logger.info("Saving config file to config.yaml")
@@ -315,15 +803,6 @@ class GeneticAlgorithm:
             config_data = self.config.model_dump(mode='json')
             yaml.dump(config_data, f, sort_keys=False)
 
-    def save_log_file(self, job_id: str, log_data: str):
-        dir_path = os.path.join(self.output_dir, 'logs')
-        os.makedirs(dir_path, exist_ok=True)
-        # Store log file in output directory under a "logs" folder.
-        log_save_path = os.path.join(dir_path, "scenario_%s.log" % job_id)
-        with open(log_save_path, 'w', encoding='utf-8') as f:
-            f.write(log_data)
-        return log_save_path
-
     def save_scenario_result(self, fitness_result: CommandRunResult):
         logger.debug("Saving scenario result for scenario %s", fitness_result.scenario_id)
         result = fitness_result.model_dump()
@@ -332,11 +811,6 @@ class GeneticAlgorithm:
         generation_id = result['generation_id']
         result['job_id'] = fitness_result.scenario_id
 
-        # Store log in a log file and update log location
-        result['log'] = self.save_log_file(
-            str(fitness_result.scenario_id),
-            result['log']
-        )
         # Convert timestamps to ISO string
         result['start_time'] = (result['start_time']).isoformat()
         result['end_time'] = (result['end_time']).isoformat()
@@ -354,14 +828,3 @@ class GeneticAlgorithm:
                 elif self.format == 'yaml':
                     yaml.dump(result, file_handler, sort_keys=False)
 
-    def __get_param_value(self, scenario: Scenario, param_name):
-        for param in scenario.parameters:
-            if param_name == param.name:
-                return param.value
-        raise ValueError(f"Parameter {param_name} not found in scenario {scenario}")
-
-    def __set_param_value(self, scenario: Scenario, param_name, value):
-        for param in scenario.parameters:
-            if param_name == param.name:
-                param.value = value
-                return
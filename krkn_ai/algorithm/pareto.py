@@ -0,0 +1,123 @@
+'''
+Multi-objective ranking of scenario results (NSGA-II).
+
+Every SLO item (or the fitness query) and the enabled krkn failure and health check scores
+are kept as separate objectives instead of being summed. All objectives are maximized.
+Results are ranked by non-dominated sorting, and within a front by crowding distance so
+that the search keeps covering the whole trade-off between objectives.
+'''
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from krkn_ai.models.app import CommandRunResult
+from krkn_ai.models.config import ConfigFile
+from krkn_ai.utils.rng import rng
+
+
+def objectives(config: ConfigFile) -> List[Tuple[str, str]]:
+    '''Name and description of every objective.'''
+    fitness_function = config.fitness_function
+    if fitness_function.query is not None:
+        result = [("fitness", fitness_function.query)]
+    else:
+        result = [("item_%d" % item.id, item.query) for item in fitness_function.items]
+    if fitness_function.include_krkn_failure:
+        result.append(("krkn_failure", "Krkn failure score"))
+    if fitness_function.include_health_check_failure:
+        result.append(("health_check_failure", "Health check failure score"))
+    if fitness_function.include_health_check_response_time:
+        result.append(("health_check_response_time", "Health check response time score"))
+    return result
+
+
+def objective_vector(result: CommandRunResult, config: ConfigFile) -> List[float]:
+    fitness_function = config.fitness_function
+    fitness_result = result.fitness_result
+    if fitness_function.query is not None:
+        # Fitness score also holds the other scores, take them out
+        vector = [
+            fitness_result.fitness_score
+            - fitness_result.krkn_failure_score
+            - fitness_result.health_check_failure_score
+            - fitness_result.health_check_response_time_score
+        ]
+    else:
+        scores: Dict[int, float] = {x.id: x.fitness_score for x in fitness_result.scores}
+        vector = [scores.get(item.id, 0.0) for item in fitness_function.items]
+    if fitness_function.include_krkn_failure:
+        vector.append(fitness_result.krkn_failure_score)
+    if fitness_function.include_health_check_failure:
+        vector.append(fitness_result.health_check_failure_score)
+    if fitness_function.include_health_check_response_time:
+        vector.append(fitness_result.health_check_response_time_score)
+    return vector
+
+
+def non_dominated_ranks(values: np.ndarray) -> np.ndarray:
+    '''
+    Pareto front index of every row of values (0 is the non-dominated front), maximizing all columns.
+    '''
+    n = len(values)
+    # dominates[i, j] is True when i is at least as good as j in all objectives and better in one
+    dominates = (values[:, None, :] >= values[None, :, :]).all(axis=2) & \
+        (values[:, None, :] > values[None, :, :]).any(axis=2)
+
+    remaining = dominates.sum(axis=0)   # Number of members dominating each member
+    ranks = np.full(n, -1)
+    front = np.flatnonzero(remaining == 0)
+    rank = 0
+    while front.size > 0:
+        ranks[front] = rank
+        remaining = remaining - dominates[front].sum(axis=0)
+        remaining[ranks >= 0] = -1
+        front = np.flatnonzero(remaining == 0)
+        rank += 1
+    return ranks
+
+
+def crowding_distance(values: np.ndarray, ranks: np.ndarray) -> np.ndarray:
+    '''
+    Crowding distance of every member within its front, boundary members get infinity.
+    '''
+    distance = np.zeros(len(values))
+    for rank in np.unique(ranks):
+        members = np.flatnonzero(ranks == rank)
+        for column in values[members].T:
+            order = np.argsort(column, kind="stable")
+            sorted_values = column[order]
+            value_range = sorted_values[-1] - sorted_values[0]
+            distance[members[order[0]]] = np.inf
+            distance[members[order[-1]]] = np.inf
+            if len(members) > 2 and value_range > 0:
+                distance[members[order[1:-1]]] += (sorted_values[2:] - sorted_values[:-2]) / value_range
+    return distance
+
+
+class ParetoRanking:
+    def __init__(self, results: List[CommandRunResult], config: ConfigFile):
+        self.results = results
+        self.values = np.array(
+            [objective_vector(result, config) for result in results], dtype=np.float64
+        ).reshape(len(results), -1)
+        self.ranks = non_dominated_ranks(self.values)
+        self.crowding = crowding_distance(self.values, self.ranks)
+
+    def front(self) -> List[CommandRunResult]:
+        '''Non-dominated results.'''
+        return [self.results[i] for i in np.flatnonzero(self.ranks == 0)]
+
+    def survivors(self, size: int) -> List[CommandRunResult]:
+        '''Best results by front, and by crowding distance within the last front that fits.'''
+        order = np.lexsort((-self.crowding, self.ranks))
+        return [self.results[i] for i in order[:size]]
+
+    def select(self, pairs: int) -> List[Tuple]:
+        '''Parent pairs drawn by binary crowded tournament.'''
+        contestants = rng.rng.integers(0, len(self.results), size=(2 * pairs, 2))
+        a, b = contestants[:, 0], contestants[:, 1]
+        a_wins = (self.ranks[a] < self.ranks[b]) | \
+            ((self.ranks[a] == self.ranks[b]) & (self.crowding[a] >= self.crowding[b]))
+        selected = np.where(a_wins, a, b).reshape(pairs, 2)
+        return [(self.results[x].scenario, self.results[y].scenario) for x, y in selected]
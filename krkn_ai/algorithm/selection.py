@@ -0,0 +1,80 @@
+'''
+Parent selection strategies.
+
+Selection probabilities are computed once for the evaluated population,
+all parent pairs of a generation are then drawn in a single vectorized call.
+'''
+
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from krkn_ai.models.config import SelectionConfig, SelectionStrategy
+from krkn_ai.utils.rng import rng
+
+
+class ParentSelector:
+    def __init__(self, fitness: Sequence[float], config: SelectionConfig):
+        self.config = config
+        self.fitness = np.asarray(fitness, dtype=np.float64)
+        self.size = len(self.fitness)
+
+        if config.strategy == SelectionStrategy.rank:
+            self.probabilities = self.__rank_probabilities()
+        elif config.strategy in (SelectionStrategy.roulette, SelectionStrategy.sus):
+            self.probabilities = self.__roulette_probabilities()
+
+    def select(self, pairs: int) -> np.ndarray:
+        '''Indices of selected parents, in shape (pairs, 2).'''
+        if self.config.strategy == SelectionStrategy.tournament:
+            selected = self.__tournament(2 * pairs)
+        elif self.config.strategy == SelectionStrategy.sus:
+            selected = self.__stochastic_universal_sampling(2 * pairs)
+        else:
+            selected = rng.rng.choice(self.size, size=2 * pairs, p=self.probabilities)
+        return selected.reshape(pairs, 2)
+
+    def __roulette_probabilities(self) -> np.ndarray:
+        # Point fitness can be negative, shift scores so that the weakest member has zero weight
+        weights = self.fitness
+        if weights.min() < 0:
+            weights = weights - weights.min()
+        total = weights.sum()
+        if total == 0:  # Handle case where all fitness scores are equal to zero
+            return np.full(self.size, 1 / self.size)
+        return weights / total
+
+    def __rank_probabilities(self) -> np.ndarray:
+        if self.size == 1:
+            return np.ones(1)
+        # Linear ranking: the weakest member gets (2 - pressure) / n, the fittest pressure / n
+        pressure = self.config.selection_pressure
+        # Tied members share their average rank
+        _, inverse, counts = np.unique(self.fitness, return_inverse=True, return_counts=True)
+        ranks = (np.cumsum(counts) - 1 - (counts - 1) / 2)[inverse]
+        probabilities = (2 - pressure + 2 * (pressure - 1) * ranks / (self.size - 1)) / self.size
+        return probabilities / probabilities.sum()
+
+    def __tournament(self, count: int) -> np.ndarray:
+        contestants = rng.rng.integers(0, self.size, size=(count, min(self.config.tournament_size, self.size)))
+        winners = np.argmax(self.fitness[contestants], axis=1)
+        return contestants[np.arange(count), winners]
+
+    def __stochastic_universal_sampling(self, count: int) -> np.ndarray:
+        # Evenly spaced pointers with a single random offset
+        pointers = (rng.rng.random() + np.arange(count)) / count
+        cumulative = np.cumsum(self.probabilities)
+        cumulative[-1] = 1.0
+        selected = np.searchsorted(cumulative, pointers, side="right")
+        # Pointers are ordered, shuffle so that pairs are not made of neighbouring members
+        return rng.rng.permutation(selected)
+
+
+def select_parent_pairs(
+    items: Sequence,
+    fitness: Sequence[float],
+    pairs: int,
+    config: SelectionConfig,
+) -> List[Tuple]:
+    selected = ParentSelector(fitness, config).select(pairs)
+    return [(items[a], items[b]) for a, b in selected]
@@ -0,0 +1,151 @@
+'''
+Surrogate model used to pre-screen offsprings before they are run on the cluster.
+
+Working Details:
+1. Scenarios are encoded as sparse features: scenario type, numeric parameter values (log scaled)
+   and categorical parameter values (one-hot). Composite scenarios add up the features of their parts.
+2. A k-nearest neighbours model over the evaluated scenarios predicts the fitness of every candidate
+   (distance weighted mean) along with its uncertainty (spread of the neighbours, plus the spread
+   of all results scaled by the distance to the nearest evaluated scenario).
+3. Candidates are ranked by predicted fitness + exploration * uncertainty, only the best ones
+   are evaluated on the cluster.
+'''
+
+import math
+import numbers
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+from krkn_ai.models.app import CommandRunResult
+from krkn_ai.models.config import SurrogateConfig
+from krkn_ai.models.scenario.base import BaseScenario, CompositeScenario
+from krkn_ai.models.scenario.genome import AnyGenome, CompositeGenome, parameter_features
+from krkn_ai.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Evaluated scenarios or offspring genomes, both have the same fingerprint and features
+Encodable = Union[BaseScenario, AnyGenome]
+
+
+class FeatureEncoder:
+    def __init__(self):
+        self.columns: Dict[str, int] = {}
+        self.numeric: List[bool] = []   # Whether the column holds a numeric value or a one-hot flag
+        self._cache: Dict[str, Dict[str, float]] = {}   # Features by scenario fingerprint
+
+    def features(self, scenario: Encodable) -> Dict[str, float]:
+        fingerprint = scenario.fingerprint
+        features = self._cache.get(fingerprint)
+        if features is None:
+            features = self._cache[fingerprint] = self.__encode(scenario)
+        return features
+
+    def matrix(self, scenarios: List[Encodable]) -> np.ndarray:
+        rows = [self.features(scenario) for scenario in scenarios]
+        for row in rows:
+            for name in row:
+                if name not in self.columns:
+                    self.columns[name] = len(self.columns)
+                    self.numeric.append(name != "composite" and "=" not in name)
+        result = np.zeros((len(rows), len(self.columns)))
+        for i, row in enumerate(rows):
+            for name, value in row.items():
+                result[i, self.columns[name]] = value
+        return result
+
+    def __encode(self, scenario: Encodable) -> Dict[str, float]:
+        # Offsprings are screened as genomes, evaluated scenarios are materialized
+        if isinstance(scenario, CompositeGenome):
+            parts = (scenario.genome_a, scenario.genome_b)
+        elif isinstance(scenario, CompositeScenario):
+            parts = (scenario.scenario_a, scenario.scenario_b)
+        else:
+            parts = None
+        if parts is not None:
+            features = {"composite": 1.0}
+            for part in parts:
+                for name, value in self.features(part).items():
+                    features[name] = features.get(name, 0.0) + value
+            return features
+
+        features = {"type=%s" % scenario.name: 1.0}
+        for name, value in parameter_features(scenario):
+            key = "%s.%s" % (scenario.name, name)
+            if isinstance(value, numbers.Real) and not isinstance(value, bool):
+                value = float(value)
+                features[key] = math.copysign(math.log1p(abs(value)), value)
+            else:
+                features["%s=%s" % (key, value)] = 1.0
+        return features
+
+
+class KNNSurrogate:
+    def __init__(self, config: SurrogateConfig):
+        self.config = config
+        self.encoder = FeatureEncoder()
+        self._scenarios: List[BaseScenario] = []
+        self._fitness = np.zeros(0)
+
+    def fit(self, results: List[CommandRunResult]):
+        self._scenarios = [result.scenario for result in results]
+        self._fitness = np.array([result.fitness_result.fitness_score for result in results], dtype=np.float64)
+
+    def predict(self, scenarios: List[Encodable]) -> Tuple[np.ndarray, np.ndarray]:
+        '''Predicted fitness and its uncertainty for each scenario.'''
+        features = self.encoder.matrix(self._scenarios + scenarios)
+
+        # Numeric columns are scaled to [0, 1] so that no parameter dominates the distance
+        numeric = np.array(self.encoder.numeric)
+        low = features[:, numeric].min(axis=0)
+        spread = features[:, numeric].max(axis=0) - low
+        features[:, numeric] = (features[:, numeric] - low) / np.where(spread > 0, spread, 1)
+
+        train, candidates = features[:len(self._scenarios)], features[len(self._scenarios):]
+        squared = (candidates ** 2).sum(axis=1)[:, None] + (train ** 2).sum(axis=1)[None, :] - 2 * candidates @ train.T
+        distances = np.sqrt(np.maximum(squared, 0))
+
+        k = min(self.config.neighbors, len(self._scenarios))
+        neighbors = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        neighbor_distances = np.take_along_axis(distances, neighbors, axis=1)
+        neighbor_fitness = self._fitness[neighbors]
+
+        weights = 1 / (neighbor_distances + 1e-9)
+        weights /= weights.sum(axis=1, keepdims=True)
+        mean = (weights * neighbor_fitness).sum(axis=1)
+        spread = np.sqrt((weights * (neighbor_fitness - mean[:, None]) ** 2).sum(axis=1))
+        nearest = neighbor_distances.min(axis=1)
+        uncertainty = spread + self._fitness.std() * nearest / (1 + nearest)
+        return mean, uncertainty
+
+    def screen(
+        self,
+        candidates: List[AnyGenome],
+        count: int,
+        seen_population: Dict[BaseScenario, CommandRunResult],
+    ) -> List[AnyGenome]:
+        '''
+        Most promising count candidates. Candidates which have already been evaluated
+        are ranked by their actual fitness.
+        '''
+        if len(self._scenarios) != len(seen_population):
+            self.fit(list(seen_population.values()))
+
+        unique = list(dict.fromkeys(candidates))
+        if len(unique) <= count:
+            return candidates[:count]
+
+        mean, uncertainty = self.predict(unique)
+        for i, scenario in enumerate(unique):
+            result = seen_population.get(scenario)
+            if result is not None:
+                mean[i], uncertainty[i] = result.fitness_result.fitness_score, 0
+        score = mean + self.config.exploration * uncertainty
+        order = np.argsort(-score, kind="stable")[:count]
+
+        logger.debug(
+            "Surrogate selected %d of %d offsprings, predicted fitness %.3f-%.3f",
+            count, len(unique), mean[order].min(), mean[order].max()
+        )
+        return [unique[i] for i in order]
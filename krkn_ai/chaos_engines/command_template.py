@@ -0,0 +1,76 @@
+'''
+Precompiled krknhub/krknctl commands for scenario classes.
+
+Parameter names are mapped to podman env vars and krknctl flags once per scenario class,
+commands are emitted as argv lists so that values are passed as is without shell quoting.
+'''
+
+from typing import Dict, List, Tuple, Type
+
+from krkn_ai.models.scenario.base import Scenario
+from krkn_ai.models.scenario.genome import layout_of
+
+
+class CommandTemplate:
+    __slots__ = ("hub_env", "cli_flags")
+
+    def __init__(self, scenario_cls: Type[Scenario]):
+        layout = layout_of(scenario_cls)
+        params = layout.defaults[:layout.size]
+        # we use parameter.name for krknhub env vars
+        self.hub_env: Tuple[str, ...] = tuple(param.name for param in params)
+        # krknctl the env parameter keys are small-casing, separated by hyphens
+        # by default we use upper-casing, separated by underscore.
+        # We use parameter.get_name() because krknctl names can be different from parameter.name
+        self.cli_flags: Tuple[str, ...] = tuple(
+            "--" + param.get_name().lower().replace("_", "-") for param in params
+        )
+
+    @staticmethod
+    def values(scenario: Scenario) -> List[str]:
+        return [str(param.get_value()) for param in scenario.parameters]
+
+    def env(self, scenario: Scenario) -> Dict[str, str]:
+        '''Parameters as krknhub env vars, used for podman and graph JSON.'''
+        return dict(zip(self.hub_env, self.values(scenario)))
+
+    def hub_command(self, scenario: Scenario, kubeconfig: str) -> List[str]:
+        command = [
+            "podman", "run", "--env-host=true",
+            "-e", "PUBLISH_KRAKEN_STATUS=False",
+            "-e", "TELEMETRY_PROMETHEUS_BACKUP=False",
+            "-e", "WAIT_DURATION=0",
+        ]
+        for name, value in zip(self.hub_env, self.values(scenario)):
+            command.extend(("-e", f"{name}={value}"))
+        command.extend((
+            "--net=host",
+            "-v", f"{kubeconfig}:/home/krkn/.kube/config:Z",
+            scenario.krknhub_image,
+        ))
+        return command
+
+    def cli_command(self, scenario: Scenario, kubeconfig: str) -> List[str]:
+        command = [
+            "krknctl", "run", scenario.krknctl_name,
+            "--telemetry-prometheus-backup", "False",
+            "--wait-duration", "0",
+            "--kubeconfig", kubeconfig,
+        ]
+        for flag, value in zip(self.cli_flags, self.values(scenario)):
+            command.extend((flag, value))
+        return command
+
+
+def graph_command(path: str, kubeconfig: str) -> List[str]:
+    return ["krknctl", "graph", "run", path, "--kubeconfig", kubeconfig]
+
+
+_templates: Dict[type, CommandTemplate] = {}
+
+
+def command_template(scenario: Scenario) -> CommandTemplate:
+    template = _templates.get(type(scenario))
+    if template is None:
+        template = _templates[type(scenario)] = CommandTemplate(type(scenario))
+    return template
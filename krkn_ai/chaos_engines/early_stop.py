@@ -0,0 +1,114 @@
+'''
+Early termination of scenarios whose outcome is already decided.
+
+Working Details:
+1. While a scenario runs, a background thread estimates its fitness score every check_interval seconds,
+   from the fitness queries over the elapsed time and the health checks collected so far.
+2. The score is settled once the last window estimates are within tolerance of the latest one
+   (or within min_delta for small scores) and the latest one reached min_score,
+   or when every health checked application failed all of its probes during the window.
+3. The scenario command is then interrupted so that krkn can roll back the injected chaos,
+   and the run is recorded as truncated.
+'''
+
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from krkn_ai.models.config import EarlyStopConfig
+from krkn_ai.models.health_check import HealthCheckSeries
+from krkn_ai.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Fitness score of the running scenario and its health check results so far, None to skip a check
+FitnessEstimate = Optional[Tuple[float, Dict[str, HealthCheckSeries]]]
+
+
+class EarlyStopPolicy:
+    def __init__(self, config: EarlyStopConfig):
+        self.config = config
+        self.scores: List[float] = []
+
+    def update(
+        self,
+        elapsed: float,
+        score: float,
+        health_check_results: Dict[str, HealthCheckSeries],
+    ) -> Optional[str]:
+        '''Record a fitness score estimate, returns the reason to stop or None to keep running.'''
+        self.scores.append(score)
+        if elapsed < self.config.min_duration or len(self.scores) < self.config.window:
+            return None
+
+        if self.config.stop_on_health_check_failure and self.__health_checks_failed(health_check_results):
+            return "all health checks failed for the last %d seconds" % self.__window_seconds()
+
+        recent = self.scores[-self.config.window:]
+        # A flat score near 0 usually means chaos hasn't taken effect yet, not that the outcome is decided
+        if abs(recent[-1]) < self.config.min_score:
+            return None
+        if max(recent) - min(recent) <= max(self.config.tolerance * abs(recent[-1]), self.config.min_delta):
+            return "fitness score settled at %.3f for the last %d seconds" % (recent[-1], self.__window_seconds())
+        return None
+
+    def __window_seconds(self) -> int:
+        return self.config.window * self.config.check_interval
+
+    def __health_checks_failed(self, health_check_results: Dict[str, HealthCheckSeries]) -> bool:
+        if len(health_check_results) == 0:
+            return False
+        cutoff = time.time() - self.__window_seconds()
+        for series in health_check_results.values():
+            recent = series.sent_array() >= cutoff
+            if not recent.any() or series.success_array()[recent].any():
+                return False
+        return True
+
+
+class EarlyStopMonitor:
+    '''
+    Watches a running scenario and sets stop_event once its outcome is decided.
+    '''
+    def __init__(self, config: EarlyStopConfig, estimate: Callable[[], FitnessEstimate]):
+        self.config = config
+        self.estimate = estimate
+        self.policy = EarlyStopPolicy(config)
+        self.stop_event = threading.Event()
+        self.reason: Optional[str] = None
+        self._done = threading.Event()
+        self._thread: threading.Thread = None
+
+    @property
+    def truncated(self) -> bool:
+        return self.stop_event.is_set()
+
+    def start(self):
+        self._start = time.monotonic()
+        self._thread = threading.Thread(target=self.__watch, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._done.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __watch(self):
+        while not self._done.wait(self.config.check_interval):
+            try:
+                estimate = self.estimate()
+            except Exception as error:
+                # A failed estimate (e.g. Prometheus unavailable) never stops the scenario
+                logger.debug("Skipping early stop check: %s", error)
+                continue
+            if estimate is None:
+                continue
+
+            score, health_check_results = estimate
+            elapsed = time.monotonic() - self._start
+            logger.debug("Estimated fitness score after %.0f seconds: %s", elapsed, score)
+            reason = self.policy.update(elapsed, score, health_check_results)
+            if reason is not None:
+                self.reason = reason
+                self.stop_event.set()
+                return
@@ -2,131 +2,338 @@
 This module is used to run health checks for the application URLs and keep track of the results.
 
 Working Details:
-1. Asynchronous health check for each URL.
-2. Keep track of the results in a list.
-3. Once there is signal from main thread that the test is complete, or in case the api status check fails, then the watcher stops.
-4. Return the results to the main thread by seperate method.
+1. A single background thread runs an asyncio event loop that schedules the health checks for all URLs.
+2. Requests are sent at a fixed rate (with optional jitter) over keep-alive connection pools (one per host),
+   with at most one request in flight per URL and a limit on concurrent requests per host.
+3. Keep track of the results in compact columnar arrays per URL.
+4. Once there is signal from main thread that the test is complete, or in case the api status check fails, then the watcher stops.
+5. Return the results to the main thread by seperate method.
 '''
 
-from collections import defaultdict
+import asyncio
+import random
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from urllib.parse import urlparse
 import requests
-from typing import List, Dict
+from requests.adapters import HTTPAdapter
+from typing import Dict, List, Optional, Tuple
 import numpy as np
 
+from krkn_ai.constants import HEALTH_CHECK_SNAPSHOT_TIMEOUT
 from krkn_ai.utils.logger import get_logger
-from krkn_ai.models.config import HealthCheckApplicationConfig, HealthCheckConfig, HealthCheckResult
+from krkn_ai.models.config import HealthCheckApplicationConfig, HealthCheckConfig
+from krkn_ai.models.app import HealthCheckScoreResult
+from krkn_ai.models.health_check import HealthCheckSeries
 
 logger = get_logger(__name__)
 
 class HealthCheckWatcher:
     def __init__(self, config: HealthCheckConfig):
         self.config = config
-        self._stop_event = threading.Event()
-        self._threads: List[threading.Thread] = []
-        # Each thread stores results in its own list - ZERO contention!
-        self._thread_results = {}
+        self._thread: threading.Thread = None
+        self._loop: asyncio.AbstractEventLoop = None
+        self._stop_event: asyncio.Event = None
+        self._started = threading.Event()
+        self._executor: ThreadPoolExecutor = None
+        self._sessions: Dict[str, requests.Session] = {}  # Map between host and its session
+        # Each application stores results in its own series
+        self._app_results: Dict[int, Tuple[str, HealthCheckSeries]] = {}
 
     def run(self):
-        # Start a thread for each health check
+        if len(self.config.applications) == 0:
+            return
+        self._wall_clock_start = time.time()
+        self._monotonic_start = time.monotonic()
         logger.debug(f"Starting health check watcher for {len(self.config.applications)} applications")
-        for health_check in self.config.applications:
-            t = threading.Thread(target=self.run_health_check, args=(health_check,))
-            t.start()
-            self._threads.append(t)
-
-    def run_health_check(self, health_check: HealthCheckApplicationConfig):
-        # Each thread gets its own private results list
-        thread_id = threading.current_thread().ident
-        thread_results = []
-        self._thread_results[thread_id] = (health_check.url, thread_results)
-        
-        # Simple polling loop, stops when stop() is called
-        while not self._stop_event.is_set():
-            try:
-                resp = requests.get(health_check.url, timeout=health_check.timeout)
-                status = resp.status_code
-                success = (status == 200)
-                error = None
-            except Exception as e:
-                status = -1
-                success = False
-                resp = None
-                error = str(e)
-
-            result = HealthCheckResult(
-                name=health_check.name,
-                status_code=status,
-                success=success,
-                error=error,
-                response_time=resp.elapsed.total_seconds() if resp is not None else -1
-            )
-            
-            # Store in thread-private list - NO LOCKS, NO CONTENTION!
-            thread_results.append(result)
+        self._executor = ThreadPoolExecutor(
+            max_workers=min(self.config.max_workers, len(self.config.applications))
+        )
+        self._thread = threading.Thread(target=self.__run_event_loop, daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+    def __run_event_loop(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._loop.run_until_complete(self.__watch())
+        finally:
+            self._loop.close()
+            self._executor.shutdown(wait=True)
+            for session in self._sessions.values():
+                session.close()
+
+    async def __watch(self):
+        self._stop_event = asyncio.Event()
+        self._started.set()
+
+        host_limits: Dict[str, asyncio.Semaphore] = {}
+        tasks = []
+        for idx, health_check in enumerate(self.config.applications):
+            results = HealthCheckSeries(health_check.name)
+            self._app_results[idx] = (health_check.url, results)
+            host = urlparse(health_check.url).netloc
+            if host not in host_limits:
+                host_limits[host] = asyncio.Semaphore(self.config.max_connections_per_host)
+            tasks.append(self.run_health_check(health_check, results, host_limits[host]))
+        await asyncio.gather(*tasks)
 
-            if not success and self.config.stop_watcher_on_failure:
+    async def run_health_check(
+        self,
+        health_check: HealthCheckApplicationConfig,
+        results: HealthCheckSeries,
+        host_limit: asyncio.Semaphore
+    ):
+        '''
+        Send probes at a fixed rate on the monotonic clock.
+
+        Probes are scheduled at start + n * interval (plus optional jitter) regardless of
+        how long previous requests took, so slow responses don't make sampling sparser.
+        At most one probe per URL is in flight, a tick is skipped while the previous probe
+        is still running. The send time of a probe is its scheduled tick, so waiting for a
+        free connection counts towards its latency.
+        '''
+        loop = asyncio.get_running_loop()
+        session = self.__get_session(health_check.url)
+        jitter_rng = random.Random()
+        in_flight: Optional[asyncio.Task] = None
+
+        async def probe(scheduled: float):
+            async with host_limit:
+                # Watcher might have been stopped while waiting for a free connection
+                if self._stop_event.is_set():
+                    return
+                result = await loop.run_in_executor(self._executor, self.__probe, session, health_check, scheduled)
+            results.append(**result)
+
+            if not result["success"] and self.config.stop_watcher_on_failure:
                 self._stop_event.set()
+
+        start = time.monotonic()
+        tick = 0
+        skipped = 0
+        while not self._stop_event.is_set():
+            scheduled = start + tick * health_check.interval
+            if health_check.jitter > 0:
+                scheduled += jitter_rng.uniform(0, health_check.jitter)
+            tick += 1
+
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=max(0, scheduled - time.monotonic()))
                 break
+            except asyncio.TimeoutError:
+                pass
+
+            if in_flight is not None and not in_flight.done():
+                skipped += 1
+                continue
+            in_flight = asyncio.create_task(probe(scheduled))
+
+        if skipped > 0:
+            logger.debug("Skipped %d health check ticks of %s, previous probe was still running", skipped, health_check.url)
+
+        # Wait for the probe that is in flight
+        if in_flight is not None:
+            await in_flight
 
-            time.sleep(health_check.interval)
+    def __probe(
+        self,
+        session: requests.Session,
+        health_check: HealthCheckApplicationConfig,
+        sent: float
+    ) -> Dict:
+        try:
+            resp = session.get(health_check.url, timeout=health_check.timeout)
+            status = resp.status_code
+            success = (status == health_check.status_code)
+            error = None
+        except Exception as e:
+            status = -1
+            success = False
+            resp = None
+            error = str(e)
+        received = time.monotonic()
+
+        return dict(
+            sent=self.__to_wall_clock(sent),
+            received=self.__to_wall_clock(received),
+            status_code=status,
+            success=success,
+            error=error,
+            response_time=resp.elapsed.total_seconds() if resp is not None else -1
+        )
+
+    def __to_wall_clock(self, monotonic_time: float) -> float:
+        # Wall clock time derived from the monotonic clock, immune to system clock changes
+        return self._wall_clock_start + (monotonic_time - self._monotonic_start)
+
+    def __get_session(self, url: str) -> requests.Session:
+        # Keep-alive connections are shared by all health checks of the same host
+        host = urlparse(url).netloc
+        if host not in self._sessions:
+            session = requests.Session()
+            adapter = HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=self.config.max_connections_per_host
+            )
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._sessions[host] = session
+        return self._sessions[host]
 
     def stop(self):
         logger.debug(f"Stopping health check watcher")
-        self._stop_event.set()
-        for t in self._threads:
-            t.join()
-
-    def get_results(self) -> Dict[str, List[HealthCheckResult]]:
-        """Aggregate results from all threads - called after threads complete"""
-        results = defaultdict(list)
-        
-        # Each thread has its own URL and results list
-        for url, thread_results in self._thread_results.values():
-            results[url].extend(thread_results)
-                
-        return dict(results)
-
-    def summarize_success_rate(self, results: Dict[str, List[HealthCheckResult]]) -> float:
+        if self._thread is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._stop_event.set)
+        except RuntimeError:
+            # Event loop has already stopped (e.g. stop_watcher_on_failure)
+            pass
+        self._thread.join()
+
+    def get_results(self) -> Dict[str, HealthCheckSeries]:
+        """Aggregate results from all health checks"""
+        results: Dict[str, HealthCheckSeries] = {}
+
+        # Each application has its own URL and results series
+        for url, app_results in list(self._app_results.values()):
+            if url not in results:
+                results[url] = HealthCheckSeries(app_results.name)
+            results[url].extend(app_results)
+
+        # Probes can complete out of order, sort them by send time
+        for series in results.values():
+            series.sort()
+        return results
+
+    def snapshot(self) -> Optional[Dict[str, HealthCheckSeries]]:
+        '''
+        Results collected so far, safe to call while the watcher is running.
+        Results are aggregated on the event loop thread so that no probe is half written,
+        returns None if the event loop doesn't get to it within HEALTH_CHECK_SNAPSHOT_TIMEOUT seconds.
+        '''
+        if self._thread is None or not self._thread.is_alive():
+            return self.get_results()
+
+        async def collect():
+            return self.get_results()
+
+        try:
+            future = asyncio.run_coroutine_threadsafe(collect(), self._loop)
+        except RuntimeError:
+            # Event loop has already stopped, results are final
+            self._thread.join()
+            return self.get_results()
+        try:
+            return future.result(timeout=HEALTH_CHECK_SNAPSHOT_TIMEOUT)
+        except FutureTimeoutError:
+            # Only an alias of the builtin TimeoutError from Python 3.11
+            future.cancel()
+            return None
+
+    def score_applications(self, results: Dict[str, HealthCheckSeries]) -> List[HealthCheckScoreResult]:
+        '''
+        Score health check results of all applications in a single vectorized pass.
+        Computes failure rate, response time outliers (IQR), p50/p95/p99 and error budget burn per URL.
+        '''
+        urls = list(results.keys())
+        if len(urls) == 0:
+            return []
+
+        lengths = np.array([len(results[url]) for url in urls], dtype=np.int64)
+        app_ids = np.repeat(np.arange(len(urls)), lengths)
+        success = np.concatenate([results[url].success_array() for url in urls])
+        response_time = np.concatenate([results[url].response_time_array() for url in urls])
+
+        failures = np.bincount(app_ids[~success], minlength=len(urls))
+        failure_rate = np.divide(failures, lengths, out=np.zeros(len(urls)), where=lengths > 0)
+        targets = {app.url: app.availability_target for app in reversed(self.config.applications)}
+        allowed_failure_rate = 1 - np.array([targets.get(url, 0.99) for url in urls])
+        error_budget_burn = failure_rate / allowed_failure_rate
+
+        # Response times of successful requests, grouped by application and sorted within each group
+        success_ids = app_ids[success]
+        success_times = response_time[success]
+        order = np.lexsort((success_times, success_ids))
+        success_ids = success_ids[order]
+        success_times = success_times[order]
+        counts = np.bincount(success_ids, minlength=len(urls))
+        q1, p50, q3, p95, p99 = self.__group_percentiles(success_times, counts, [25, 50, 75, 95, 99]).T
+
+        # Applications with less than 4 samples do not have enough data to calculate outliers
+        upper_bound = q3 + 1.5 * (q3 - q1)
+        is_outlier = (counts[success_ids] >= 4) & (success_times > upper_bound[success_ids])
+        outliers = np.bincount(success_ids[is_outlier], minlength=len(urls))
+
+        def optional(value: float) -> Optional[float]:
+            return None if np.isnan(value) else float(value)
+
+        return [
+            HealthCheckScoreResult(
+                name=results[url].name,
+                url=url,
+                samples=int(lengths[i]),
+                failures=int(failures[i]),
+                failure_rate=float(failure_rate[i]),
+                outliers=int(outliers[i]),
+                p50=optional(p50[i]),
+                p95=optional(p95[i]),
+                p99=optional(p99[i]),
+                error_budget_burn=float(error_budget_burn[i]),
+            )
+            for i, url in enumerate(urls)
+        ]
+
+    def __group_percentiles(self, values: np.ndarray, counts: np.ndarray, percentiles: List[float]) -> np.ndarray:
+        '''
+        Linear interpolated percentiles (same as np.percentile) for consecutive sorted groups of values.
+        Returns an array of shape (groups, percentiles), nan for empty groups.
+        '''
+        offsets = np.cumsum(counts) - counts
+        position = offsets[:, None] + np.maximum(counts - 1, 0)[:, None] * (np.asarray(percentiles) / 100)[None, :]
+        result = np.full(position.shape, np.nan)
+        valid = counts > 0
+        if not np.any(valid):
+            return result
+        position = position[valid]
+        lower = np.floor(position).astype(np.int64)
+        upper = np.ceil(position).astype(np.int64)
+        result[valid] = values[lower] + (values[upper] - values[lower]) * (position - lower)
+        return result
+
+    def summarize_success_rate(
+        self,
+        results: Dict[str, HealthCheckSeries],
+        scores: Optional[List[HealthCheckScoreResult]] = None
+    ) -> float:
         '''
         Overall fail score across different URL results
         '''
-        # Flatten all results from all URLs into a single list
-        all_results = []
-        for result_list in results.values():
-            all_results.extend(result_list)
-        
-        total = len(all_results)
+        if scores is None:
+            scores = self.score_applications(results)
+        total = sum(x.samples for x in scores)
         if total == 0:
             return 0
-        failed = sum(1 for r in all_results if not r.success)
-        score = (failed / total) * 10 
+        failed = sum(x.failures for x in scores)
+        score = (failed / total) * 10
         logger.debug(f"Health check failure rate score: {score}")
         return score
-    
-    def summarize_response_time(self, health_check_results: Dict[str, List[HealthCheckResult]]) -> float:
-        score = 0
-        total = 0
-        for _, results in health_check_results.items():
-            response_times = []
-            for result in results:
-                if result.success:
-                    response_times.append(result.response_time)
-            
-            if len(response_times) < 4: # Not enough data to calculate outliers
-                return 0
-
-            q1 = np.percentile(response_times, 25)
-            q3 = np.percentile(response_times, 75)
-            iqr = q3 - q1
-            upper_bound = q3 + (1.5 * iqr)
-            
-            outliers = [t for t in response_times if t > upper_bound]
-            score += len(outliers)
-            total += len(results)
+
+    def summarize_response_time(
+        self,
+        health_check_results: Dict[str, HealthCheckSeries],
+        scores: Optional[List[HealthCheckScoreResult]] = None
+    ) -> float:
+        '''
+        Overall response time outlier score across different URL results
+        '''
+        if scores is None:
+            scores = self.score_applications(health_check_results)
+        total = sum(x.samples for x in scores)
         if total == 0:
             return 0
-        score = (score / total) * 10
+        score = (sum(x.outliers for x in scores) / total) * 10
         logger.debug(f"Response time outlier score: {score}")
         return score
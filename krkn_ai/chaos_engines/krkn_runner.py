@@ -1,30 +1,34 @@
 import os
 import json
+import shlex
+import time
 import datetime
+import shutil
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
 
 from krkn_lib.prometheus.krkn_prometheus import KrknPrometheus
+from krkn_ai.constants import IMAGE_PULL_MAX_WORKERS
+from krkn_ai.chaos_engines.command_template import command_template, graph_command
+from krkn_ai.chaos_engines.early_stop import EarlyStopMonitor, FitnessEstimate
 from krkn_ai.chaos_engines.health_check_watcher import HealthCheckWatcher
+import krkn_ai.models.app as app_models
 from krkn_ai.models.app import CommandRunResult, FitnessResult, FitnessScoreResult, KrknRunnerType
 from krkn_ai.models.config import ConfigFile, FitnessFunctionType
+from krkn_ai.models.health_check import HealthCheckSeries
 from krkn_ai.models.scenario.base import Scenario, BaseScenario, CompositeDependency, CompositeScenario
 from krkn_ai.models.scenario.factory import ScenarioFactory
-from krkn_ai.utils import run_shell
+from krkn_ai.utils import run_shell, run_shell_to_file
 from krkn_ai.utils.fs import env_is_truthy
 from krkn_ai.utils.logger import get_logger
-from krkn_ai.utils.prometheus import create_prometheus_client
+from krkn_ai.utils.prometheus import create_prometheus_batch_client, create_prometheus_client
 from krkn_ai.utils.rng import rng
 
 logger = get_logger(__name__)
 
 # TODO: Cleanup of temp kubeconfig after running the script
 
-PODMAN_TEMPLATE = 'podman run --env-host=true -e PUBLISH_KRAKEN_STATUS="False" -e TELEMETRY_PROMETHEUS_BACKUP="False" -e WAIT_DURATION=0 {env_list} --net=host -v {kubeconfig}:/home/krkn/.kube/config:Z {image}'
-
-KRKNCTL_TEMPLATE = "krknctl run {name} --telemetry-prometheus-backup False --wait-duration 0 --kubeconfig {kubeconfig} {env_list}"
-
-KRKNCTL_GRAPH_RUN_TEMPLATE = "krknctl graph run {path} --kubeconfig {kubeconfig}"
-
 KRKN_HUB_FAILURE_SCORE = 5
 
 
@@ -37,6 +41,10 @@ class KrknRunner:
     ):
         self.config = config
         self.prom_client = create_prometheus_client(self.config.kubeconfig_file_path)
+        self.prom_batch_client = create_prometheus_batch_client(
+            self.config.kubeconfig_file_path,
+            max_workers=max(1, len(self.config.fitness_function.items)),
+        )
         self.output_dir = output_dir
         if runner_type is None:
             self.runner_type = self.__check_runner_availability()
@@ -44,6 +52,11 @@ class KrknRunner:
             logger.debug("Using user provided runner type: %s", runner_type)
             self.runner_type = runner_type
 
+    def close(self):
+        '''
+        Release connections held by the runner.
+        '''
+        self.prom_batch_client.close()
 
     def __check_runner_availability(self):
         # Check if krknctl is available
@@ -75,9 +88,13 @@ class KrknRunner:
 
         start_time = datetime.datetime.now()
 
+        # Scenario id is allocated upfront to name the log file
+        scenario_id = next(app_models.auto_id)
+        log = self.log_path(scenario_id)
+
         # Generate command krkn executor command
-        log, returncode = None, None
-        command = ""
+        returncode = None
+        command = []
         if isinstance(scenario, CompositeScenario):
             command = self.graph_command(scenario)
         elif isinstance(scenario, Scenario):
@@ -86,26 +103,81 @@ class KrknRunner:
             raise NotImplementedError("Scenario unable to run")
 
         health_check_watcher = HealthCheckWatcher(self.config.health_checks)
+        truncated = False
 
         # Run command and fetch result
         if env_is_truthy('MOCK_RUN'):
             # Used for running mock tests
-            log, returncode = "", 0
+            returncode = 0
+            os.makedirs(os.path.dirname(log), exist_ok=True)
+            open(log, "w").close()
         else:
             # TODO: How to capture logs from composite run scenario
             
             # Start watching application urls for health checks
             health_check_watcher.run()
 
-            # Run command
-            log, returncode = run_shell(command, do_not_log=True)
-            
+            # Stop the scenario once its fitness score has settled
+            early_stop = None
+            if self.config.early_stop.enable:
+                early_stop = EarlyStopMonitor(
+                    self.config.early_stop,
+                    lambda: self.__estimate_fitness(start_time, health_check_watcher),
+                )
+                early_stop.start()
+
+            # Run command, output is streamed to the log file
+            log_tail, returncode = run_shell_to_file(
+                command,
+                log,
+                compress=self.config.compress_logs,
+                stop=early_stop.stop_event if early_stop is not None else None,
+            )
+
+            if early_stop is not None:
+                early_stop.stop()
+                truncated = early_stop.truncated
+                if truncated:
+                    logger.info("Scenario %s stopped early: %s", scenario, early_stop.reason)
+
             # Stop watching application urls for health checks
             health_check_watcher.stop()
 
+            # Status code 2 means that SLOs not met, anything else is a failure of the run
+            # Interrupted scenarios exit with an arbitrary status
+            if returncode not in (0, 2) and not truncated:
+                logger.warning(
+                    "Scenario %s exited with status %d, last lines of %s:\n%s",
+                    scenario, returncode, log, log_tail
+                )
+
         end_time = datetime.datetime.now()
 
         # calculate fitness scores
+        fitness_result = self.calculate_fitness(start_time, end_time)
+
+        health_check_results = health_check_watcher.get_results()
+        fitness_result = self.combine_fitness(
+            fitness_result, returncode, health_check_watcher, health_check_results
+        )
+        logger.info("Fitness score: %s", fitness_result.fitness_score)
+
+        return CommandRunResult(
+            scenario_id=scenario_id,
+            generation_id=generation_id,
+            scenario=scenario,
+            cmd=shlex.join(command),
+            log=log,
+            returncode=returncode,
+            start_time=start_time,
+            end_time=end_time,
+            fitness_result=fitness_result,
+            health_check_results=health_check_results,
+            truncated=truncated,
+        )
+
+    def calculate_fitness(self, start_time: datetime.datetime, end_time: datetime.datetime) -> FitnessResult:
+        '''SLO fitness score of the time range, without krkn failure and health check scores.'''
         fitness_result: FitnessResult = FitnessResult()
 
         # If user provided fitness_function.query, then we use the default function to calculate
@@ -122,20 +194,48 @@ class KrknRunner:
                 start=start_time,
                 end=end_time
             )
+        return fitness_result
 
-        health_check_results = health_check_watcher.get_results()
-
+    def __estimate_fitness(
+        self,
+        start_time: datetime.datetime,
+        health_check_watcher: HealthCheckWatcher,
+    ) -> FitnessEstimate:
+        '''Fitness score of a running scenario so far, krkn failure is only known once it exits.'''
+        health_check_results = health_check_watcher.snapshot()
+        if health_check_results is None:
+            return None
+        fitness_result = self.calculate_fitness(start_time, datetime.datetime.now())
+        fitness_result = self.combine_fitness(fitness_result, 0, health_check_watcher, health_check_results)
+        return fitness_result.fitness_score, health_check_results
+
+    def combine_fitness(
+        self,
+        fitness_result: FitnessResult,
+        returncode: int,
+        health_check_watcher: HealthCheckWatcher,
+        health_check_results: Dict[str, HealthCheckSeries],
+    ) -> FitnessResult:
+        '''Add krkn failure and health check scores to the SLO fitness score.'''
         # Include krkn hub run failure info to the fitness score
         if self.config.fitness_function.include_krkn_failure:
             # Status code 2 means that SLOs not met per Krkn test
             if returncode == 2:
                 fitness_result.krkn_failure_score = KRKN_HUB_FAILURE_SCORE
 
+        # Per application health check breakdown
+        health_check_scores = health_check_watcher.score_applications(health_check_results)
+        fitness_result.health_check_scores = health_check_scores
+
         # Include health check failure and response time to the fitness score
         if self.config.fitness_function.include_health_check_failure:
-            fitness_result.health_check_failure_score = health_check_watcher.summarize_success_rate(health_check_results)
+            fitness_result.health_check_failure_score = health_check_watcher.summarize_success_rate(
+                health_check_results, health_check_scores
+            )
         if self.config.fitness_function.include_health_check_response_time:
-            fitness_result.health_check_response_time_score = health_check_watcher.summarize_response_time(health_check_results)
+            fitness_result.health_check_response_time_score = health_check_watcher.summarize_response_time(
+                health_check_results, health_check_scores
+            )
 
         # Calculate overall fitness score
         fitness_result.fitness_score = sum([
@@ -144,55 +244,69 @@ class KrknRunner:
             fitness_result.health_check_failure_score,
             fitness_result.health_check_response_time_score
         ])
-        logger.info("Fitness score: %s", fitness_result.fitness_score)
+        return fitness_result
 
-        return CommandRunResult(
-            generation_id=generation_id,
-            scenario=scenario,
-            cmd=command,
-            log=log,
-            returncode=returncode,
-            start_time=start_time,
-            end_time=end_time,
-            fitness_result=fitness_result,
-            health_check_results=health_check_results
+    def scenario_images(self) -> List[str]:
+        '''Images that podman runs for the scenarios enabled in config (krknhub runner).'''
+        return sorted({
+            cls.model_fields["krknhub_image"].default
+            for _, cls in ScenarioFactory.list_scenarios(self.config)
+        })
+
+    def prepull_images(self):
+        '''
+        Pull scenario images in parallel before the run so that the first run of each
+        scenario doesn't include the image pull in its chaos window.
+
+        Only done for the krknhub runner, which runs these exact images with podman.
+        krknctl resolves image tags from its own registry configuration, and composite
+        scenarios always run as krknctl graphs, so their images are pulled on first use.
+        '''
+        if env_is_truthy('MOCK_RUN'):
+            return
+        if self.runner_type != KrknRunnerType.HUB_RUNNER:
+            logger.info("Image pre-pull is only supported with the krknhub runner, skipping it.")
+            return
+        if shutil.which("podman") is None:
+            logger.warning("podman is not available, skipping image pre-pull.")
+            return
+
+        images = self.scenario_images()
+        logger.info("Pulling %d scenario images", len(images))
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=max(1, min(IMAGE_PULL_MAX_WORKERS, len(images)))) as executor:
+            results = list(executor.map(self.__pull_image, images))
+        pulled = sum(1 for success in results if success)
+        logger.info(
+            "Pulled %d/%d scenario images in %.2f seconds",
+            pulled, len(images), time.time() - start_time
         )
 
-    def runner_command(self, scenario: Scenario):
+    def __pull_image(self, image: str) -> bool:
+        start_time = time.time()
+        log, returncode = run_shell(["podman", "pull", "--quiet", image], do_not_log=True)
+        if returncode != 0:
+            # Not fatal, the image is pulled again when the scenario runs
+            logger.warning("Failed to pull image %s: %s", image, log.strip())
+            return False
+        logger.debug("Pulled image %s in %.2f seconds", image, time.time() - start_time)
+        return True
+
+    def log_path(self, scenario_id: int) -> str:
+        # Store log file in output directory under a "logs" folder.
+        extension = ".log.gz" if self.config.compress_logs else ".log"
+        return os.path.join(self.output_dir, "logs", "scenario_%s%s" % (scenario_id, extension))
+
+    def runner_command(self, scenario: Scenario) -> List[str]:
         """Generate command for krkn runner (krknctl, krknhub)"""
+        template = command_template(scenario)
         if self.runner_type == KrknRunnerType.HUB_RUNNER:
-            # Generate env items
-            env_list = ""
-            for parameter in scenario.parameters:
-                # we use parameter.name instead of parameter.get_name() because krknhub uses parameter.name
-                env_list += f' -e {parameter.name}="{parameter.get_value()}" '
-
-            command = PODMAN_TEMPLATE.format(
-                env_list=env_list,
-                kubeconfig=self.config.kubeconfig_file_path,
-                image=scenario.krknhub_image,
-            )
-            return command
+            return template.hub_command(scenario, self.config.kubeconfig_file_path)
         elif self.runner_type == KrknRunnerType.CLI_RUNNER:
-            # Generate env parameters for scenario
-            # krknctl the env parameter keys are small-casing, separated by hyphens
-            # by default we use upper-casing, separated by underscore.
-            env_list = ""
-            for parameter in scenario.parameters:
-                # TODO: This is a hack to make krknctl work. Probably need some unified naming convention for parameters.
-                # We use parameter.get_name() because krknctl names can be different from parameter.name which is used mainly in Krknhub
-                param_name = (parameter.get_name()).lower().replace("_", "-")
-                env_list += f'--{param_name} "{parameter.get_value()}" '
-
-            command = KRKNCTL_TEMPLATE.format(
-                env_list=env_list,
-                kubeconfig=self.config.kubeconfig_file_path,
-                name=scenario.krknctl_name,
-            )
-            return command
+            return template.cli_command(scenario, self.config.kubeconfig_file_path)
         raise Exception("Unsupported runner type")
 
-    def graph_command(self, scenario: CompositeScenario):
+    def graph_command(self, scenario: CompositeScenario) -> List[str]:
         # Create directory under output folder to save CompositeScenario config
         graph_json_directory = os.path.join(self.output_dir, "graphs")
         os.makedirs(graph_json_directory, exist_ok=True)
@@ -205,10 +319,7 @@ class KrknRunner:
         logger.info("Created scenario json in path: %s", json_file)
 
         # Run Json graph
-        command = KRKNCTL_GRAPH_RUN_TEMPLATE.format(
-            path=json_file, kubeconfig=self.config.kubeconfig_file_path
-        )
-        return command
+        return graph_command(json_file, self.config.kubeconfig_file_path)
 
     def __expand_composite_json(
         self,
@@ -287,7 +398,7 @@ class KrknRunner:
 
     def __generate_scenario_json(self, scenario: Scenario, depends_on: str = None):
         # generate a json based on https://krkn-chaos.dev/docs/krknctl/randomized-chaos-testing/#example
-        env = {param.name: str(param.get_value()) for param in scenario.parameters}
+        env = command_template(scenario).env(scenario)
         result = {
             "image": scenario.krknhub_image,
             "name": scenario.name,
@@ -314,16 +425,46 @@ class KrknRunner:
     def calculate_fitness_score_for_items(self, start, end):
         '''
         This is used to compute fitness scores when multiple SLOs are defined.
+
+        Queries for all items are sent concurrently. Point fitness is fetched with a
+        single range query whose step spans the test, which returns the start and end samples.
         '''
+        items = self.config.fitness_function.items
+
+        if env_is_truthy("MOCK_FITNESS"):
+            raw_scores = [rng.random() for _ in items]
+        else:
+            queries = []
+            for fitness_item in items:
+                if fitness_item.type == FitnessFunctionType.point:
+                    step = (end - start).total_seconds()
+                    queries.append((fitness_item.query, start, end, step))
+                elif fitness_item.type == FitnessFunctionType.range:
+                    queries.append((self.__prepare_range_query(start, end, fitness_item.query), start, end, 100))
+
+            batch_start = time.perf_counter()
+            try:
+                responses = self.prom_batch_client.query_range_batch(queries)
+            except Exception as error:
+                logger.error("Fitness function calculation failed: %s", error)
+                raise error
+            logger.debug(
+                "Evaluated %d fitness queries in %.3fs",
+                len(queries), time.perf_counter() - batch_start
+            )
+
+            raw_scores = []
+            for fitness_item, (result, latency) in zip(items, responses):
+                logger.debug("Fitness query %d took %.3fs", fitness_item.id, latency)
+                values = result[0]["values"]
+                if fitness_item.type == FitnessFunctionType.point:
+                    raw_scores.append(float(values[-1][1]) - float(values[0][1]))
+                else:
+                    raw_scores.append(float(values[-1][1]))
+
         results = []
         overall_score = 0
-        for fitness_item in self.config.fitness_function.items:
-            raw_score = self.calculate_fitness_value(
-                start=start,
-                end=end,
-                query=fitness_item.query,
-                fitness_type=fitness_item.type
-            )
+        for fitness_item, raw_score in zip(items, raw_scores):
             fitness_value = fitness_item.weight * raw_score
             overall_score += fitness_value
 
@@ -370,6 +511,18 @@ class KrknRunner:
         """
         logger.debug("Calculating Range Fitness")
 
+        query = self.__prepare_range_query(start, end, query)
+
+        result = self.prom_client.process_prom_query_in_range(
+            query,
+            start_time=start,
+            end_time=end,
+            granularity=100,
+        )[0]["values"][-1][1]
+
+        return float(result)
+
+    def __prepare_range_query(self, start, end, query):
         # Calculate number of minutes between test run
         if "$range$" in query:
             time_dt_mins = int((end - start).total_seconds() / 60)
@@ -380,12 +533,4 @@ class KrknRunner:
             logger.warning(
                 "You are missing $range$ in config.fitness_function.query to specify dynamic range. Fitness function will use specified range"
             )
-
-        result = self.prom_client.process_prom_query_in_range(
-            query,
-            start_time=start,
-            end_time=end,
-            granularity=100,
-        )[0]["values"][-1][1]
-
-        return float(result)
+        return query
@@ -0,0 +1,203 @@
+'''
+In-process simulation of scenario runs, used to tune and benchmark the genetic algorithm offline.
+
+Working Details:
+1. Every scenario type and parameter gets a synthetic fitness contribution derived from the
+   simulator seed. Numeric values follow a smooth wave so that nearby values score alike,
+   other values get a fixed pseudo random score.
+2. Scenario duration is taken from its duration parameters and advances a simulated clock,
+   nothing sleeps.
+3. Health check series are sampled for the configured applications and scored with the
+   same code as real runs, as are krkn failures.
+'''
+
+import datetime
+import hashlib
+import math
+import numbers
+import threading
+from functools import lru_cache
+from typing import Dict, Tuple
+
+import numpy as np
+
+import krkn_ai.models.app as app_models
+from krkn_ai.chaos_engines.health_check_watcher import HealthCheckWatcher
+from krkn_ai.chaos_engines.krkn_runner import KrknRunner
+from krkn_ai.models.app import CommandRunResult, FitnessResult, FitnessScoreResult, KrknRunnerType
+from krkn_ai.models.config import ConfigFile, SimulatorConfig
+from krkn_ai.models.health_check import HealthCheckSeries
+from krkn_ai.models.scenario.base import BaseScenario, CompositeDependency, CompositeScenario
+from krkn_ai.models.scenario.genome import parameter_features
+from krkn_ai.utils.logger import get_logger
+from krkn_ai.utils.rng import rng
+
+logger = get_logger(__name__)
+
+HEALTH_CHECK_FAILURE_STATUS = 503
+
+
+@lru_cache(maxsize=65536)
+def _unit(*keys) -> float:
+    '''Deterministic value in [0, 1) for the given keys.'''
+    digest = hashlib.blake2b("\0".join(map(str, keys)).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") / 2 ** 64
+
+
+class FitnessLandscape:
+    def __init__(self, config: SimulatorConfig):
+        self.config = config
+        self._waves: Dict[Tuple[str, str], Tuple[float, float]] = {}
+
+    def value(self, scenario: BaseScenario) -> float:
+        if isinstance(scenario, CompositeScenario):
+            combined = self.value(scenario.scenario_a) + self.value(scenario.scenario_b)
+            return combined * self.config.composition_bonus
+
+        seed = self.config.seed
+        base = self.config.scenario_weights.get(scenario.name)
+        if base is None:
+            base = _unit(seed, scenario.name)
+        features = parameter_features(scenario)
+        if len(features) == 0:
+            return base
+
+        total = 0.0
+        for name, value in features:
+            weight = self.config.parameter_weights.get(name.split(".")[0], 1.0)
+            total += weight * self.__term(scenario.name, name, value)
+        return base + total / len(features)
+
+    def duration(self, scenario: BaseScenario) -> float:
+        '''Simulated duration of a scenario in seconds.'''
+        if isinstance(scenario, CompositeScenario):
+            duration_a = self.duration(scenario.scenario_a)
+            duration_b = self.duration(scenario.scenario_b)
+            if scenario.dependency == CompositeDependency.NONE:
+                return max(duration_a, duration_b)
+            return duration_a + duration_b
+        durations = [
+            float(param.value) for param in scenario.parameters
+            if "DURATION" in param.name.upper() and self.__is_number(param.value)
+        ]
+        return max(durations) if len(durations) > 0 else float(self.config.duration)
+
+    def __term(self, scenario_name: str, name: str, value) -> float:
+        if self.__is_number(value):
+            key = (scenario_name, name)
+            wave = self._waves.get(key)
+            if wave is None:
+                seed = self.config.seed
+                wave = self._waves[key] = (
+                    1 + 2 * _unit(seed, scenario_name, name, "frequency"),
+                    2 * math.pi * _unit(seed, scenario_name, name, "phase"),
+                )
+            frequency, phase = wave
+            # Log scale since parameter values range from fractions to thousands
+            return 0.5 * (1 + math.sin(frequency * math.log1p(abs(float(value))) + phase))
+        return _unit(self.config.seed, scenario_name, name, value)
+
+    @staticmethod
+    def __is_number(value) -> bool:
+        return isinstance(value, numbers.Real) and not isinstance(value, bool)
+
+
+class SimulatedKrknRunner(KrknRunner):
+    '''
+    KrknRunner backend which evaluates scenarios against a synthetic fitness landscape
+    instead of running them on a cluster.
+    '''
+    def __init__(self, config: ConfigFile, output_dir: str):
+        self.config = config
+        self.output_dir = output_dir
+        self.runner_type = KrknRunnerType.SIMULATED_RUNNER
+        self.landscape = FitnessLandscape(config.simulator)
+
+        # Simulated clock, advanced by the duration of every scenario
+        self._clock = datetime.datetime.now()
+        self._clock_lock = threading.Lock()
+
+    def prepull_images(self):
+        pass
+
+    def close(self):
+        pass
+
+    def run(self, scenario: BaseScenario, generation_id: int) -> CommandRunResult:
+        logger.debug("Simulating scenario: %s", scenario)
+        simulator = self.config.simulator
+
+        duration = self.landscape.duration(scenario)
+        with self._clock_lock:
+            start_time = self._clock
+            end_time = self._clock = start_time + datetime.timedelta(seconds=duration)
+
+        value = self.landscape.value(scenario)
+        if simulator.noise > 0:
+            value += rng.rng.normal(0, simulator.noise)
+
+        fitness_result = FitnessResult()
+        if self.config.fitness_function.query is not None:
+            fitness_result.fitness_score = value
+        else:
+            # Every SLO sees a differently scaled version of the same landscape
+            for item in self.config.fitness_function.items:
+                raw_score = value * (0.5 + _unit(simulator.seed, "item", item.query))
+                fitness_result.scores.append(FitnessScoreResult(
+                    id=item.id,
+                    fitness_score=raw_score,
+                    weighted_score=item.weight * raw_score,
+                ))
+            fitness_result.fitness_score = sum(x.weighted_score for x in fitness_result.scores)
+
+        # Status code 2 means that SLOs not met per Krkn test
+        returncode = 0
+        if _unit(simulator.seed, "krkn", scenario.fingerprint) < simulator.krkn_failure_rate:
+            returncode = 2
+
+        health_check_results = self.simulate_health_checks(scenario, start_time, duration)
+        fitness_result = self.combine_fitness(
+            fitness_result,
+            returncode,
+            HealthCheckWatcher(self.config.health_checks),
+            health_check_results,
+        )
+        logger.debug("Simulated fitness score: %s", fitness_result.fitness_score)
+
+        return CommandRunResult(
+            generation_id=generation_id,
+            scenario_id=next(app_models.auto_id),
+            scenario=scenario,
+            cmd="",
+            log="",
+            returncode=returncode,
+            start_time=start_time,
+            end_time=end_time,
+            fitness_result=fitness_result,
+            health_check_results=health_check_results,
+        )
+
+    def simulate_health_checks(
+        self,
+        scenario: BaseScenario,
+        start_time: datetime.datetime,
+        duration: float
+    ) -> Dict[str, HealthCheckSeries]:
+        '''Sample health checks of all applications for the duration of the scenario.'''
+        simulator = self.config.simulator
+        results: Dict[str, HealthCheckSeries] = {}
+        for app in self.config.health_checks.applications:
+            samples = max(1, int(duration // app.interval))
+            impact = simulator.health_check_impact * _unit(simulator.seed, app.url, scenario.fingerprint)
+
+            sent = start_time.timestamp() + app.interval * np.arange(samples, dtype=np.float64)
+            success = rng.rng.random(samples) >= impact
+            response_time = simulator.response_time * rng.rng.lognormal(0, 0.25 + impact, samples)
+
+            series = results.setdefault(app.url, HealthCheckSeries(app.name))
+            series.sent.extend(sent.tolist())
+            series.received.extend((sent + response_time).tolist())
+            series.response_time.extend(response_time.tolist())
+            series.status_code.extend(np.where(success, app.status_code, HEALTH_CHECK_FAILURE_STATUS).tolist())
+            series.success.extend(success.astype(np.int8).tolist())
+        return results
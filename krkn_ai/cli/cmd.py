@@ -4,12 +4,15 @@ import click
 from pydantic import ValidationError
 from krkn_ai.utils.logger import init_logger, get_logger
 
+from krkn_ai.algorithm.benchmark import GABenchmark, compare, load_results
 from krkn_ai.algorithm.genetic import GeneticAlgorithm
 from krkn_ai.models.app import AppContext, KrknRunnerType
 from krkn_ai.models.custom_errors import PrometheusConnectionError
 from krkn_ai.utils.fs import read_config_from_file
 from krkn_ai.templates.generator import create_krkn_ai_template
 from krkn_ai.utils.cluster_manager import ClusterManager
+import krkn_ai.constants as const
+from krkn_ai.constants import DISCOVERY_MAX_WORKERS
 
 
 @click.group(context_settings={"show_default": True})
@@ -26,14 +29,15 @@ def main():
     default='yaml'
 )
 @click.option('--runner-type', '-r', 
-              type=click.Choice(['krknctl', 'krknhub'], case_sensitive=False),
-              help='Type of chaos engine to use.', default=None)
+              type=click.Choice(['krknctl', 'krknhub', 'simulated'], case_sensitive=False),
+              help='Type of chaos engine to use, simulated evaluates scenarios against a synthetic cluster.', default=None)
 @click.option(
     '--param', '-p',
     multiple=True,
     help='Additional parameters for config file in key=value format.',
     default=[]
 )
+@click.option('--resume', help='Output directory of an interrupted run to resume from its last checkpoint.', default=None)
 @click.option('-v', '--verbose', count=True, help='Increase verbosity of output.')
 @click.pass_context
 def run(ctx,
@@ -42,8 +46,15 @@ def run(ctx,
     format: str = 'yaml',
     runner_type: str = None,
     param: list[str] = None,
+    resume: str = None,
     verbose: int = 0       # Default to INFO level
 ):
+    if resume:
+        # Resumed run continues in the same output directory with its saved config
+        output = resume
+        if config == '' or config is None:
+            config = os.path.join(resume, "krkn-ai.yaml")
+
     init_logger(output, verbose >= 2)
     logger = get_logger(__name__)
 
@@ -68,6 +79,8 @@ def run(ctx,
             enum_runner_type = KrknRunnerType.CLI_RUNNER
         elif runner_type.lower() == 'krknhub':
             enum_runner_type = KrknRunnerType.HUB_RUNNER
+        elif runner_type.lower() == 'simulated':
+            enum_runner_type = KrknRunnerType.SIMULATED_RUNNER
 
     try:
         genetic = GeneticAlgorithm(
@@ -76,12 +89,17 @@ def run(ctx,
             format=format,
             runner_type=enum_runner_type
         )
+        if resume:
+            genetic.load_checkpoint()
         genetic.simulate()
 
         genetic.save()
     except PrometheusConnectionError as e:
         logger.error("%s", e)
         exit(1)
+    except KeyboardInterrupt:
+        logger.warning("Run interrupted. Continue it with: krkn_ai run --resume %s", output)
+        exit(1)
     except Exception as e:
         logger.exception("Something went wrong: %s", e)
         exit(1)
@@ -97,6 +115,7 @@ def run(ctx,
 @click.option('--namespace', '-n', help='Namespace(s) to discover components in. Supports Regex and comma separated values.', default='.*')
 @click.option('--pod-label', '-pl', help='Pod Label Keys(s) to filter. Supports Regex and comma separated values.', default='.*', required=False)
 @click.option('--node-label', '-nl', help='Node Label Keys(s) to filter. Supports Regex and comma separated values.', default='.*', required=False)
+@click.option('--max-workers', help='Number of nodes to probe for network interfaces concurrently.', default=DISCOVERY_MAX_WORKERS, type=click.IntRange(min=1), show_default=True)
 @click.option('-v', '--verbose', count=True, help='Increase verbosity of output.')
 @click.pass_context
 def discover(
@@ -106,6 +125,7 @@ def discover(
     namespace: str = "*",
     pod_label: str = ".*",
     node_label: str = ".*",
+    max_workers: int = DISCOVERY_MAX_WORKERS,
     verbose: int = 0
 ):
     init_logger(None, verbose >= 2)
@@ -115,7 +135,7 @@ def discover(
         logger.warning("Kubeconfig file not found.")
         exit(1)
 
-    cluster_manager = ClusterManager(kubeconfig)
+    cluster_manager = ClusterManager(kubeconfig, max_workers=max_workers)
 
     cluster_components = cluster_manager.discover_components(
         namespace_pattern=namespace,
@@ -131,3 +151,49 @@ def discover(
         f.write(template)
 
     logger.info("Saved component configuration to %s", output)
+
+
+def parse_cluster_size(ctx, param, value):
+    try:
+        return [tuple(int(x) for x in size.split(":", 1)) for size in value]
+    except ValueError:
+        raise click.BadParameter("Cluster size should be in nodes:pods format, e.g. 100:1000")
+
+
+@main.command(
+    help='Benchmark genetic algorithm against synthetic clusters'
+)
+@click.option('--output', '-o', help='Directory to save benchmark results.', default='./benchmark')
+@click.option('--size', '-s', multiple=True, callback=parse_cluster_size,
+              help='Cluster size in nodes:pods format, can be repeated. Defaults to %s.' % ", ".join(
+                  "%d:%d" % size for size in const.BENCHMARK_CLUSTER_SIZES))
+@click.option('--iterations', '-i', help='Operations per stage and cluster size.',
+              default=const.BENCHMARK_ITERATIONS, type=click.IntRange(min=1))
+@click.option('--baseline', '-b', help='Results of a previous benchmark to compare throughput against.', default=None)
+@click.option('--tolerance', help='Allowed throughput drop compared to baseline (0.0-1.0).',
+              default=const.BENCHMARK_TOLERANCE, type=click.FloatRange(0, 1))
+@click.option('-v', '--verbose', count=True, help='Increase verbosity of output.')
+@click.pass_context
+def benchmark(
+    ctx,
+    output: str = './benchmark',
+    size: list = None,
+    iterations: int = const.BENCHMARK_ITERATIONS,
+    baseline: str = None,
+    tolerance: float = const.BENCHMARK_TOLERANCE,
+    verbose: int = 0
+):
+    init_logger(output, verbose >= 2)
+    logger = get_logger(__name__)
+
+    ga_benchmark = GABenchmark(output, iterations=iterations)
+    results = ga_benchmark.run(list(size) or const.BENCHMARK_CLUSTER_SIZES)
+    logger.info("Saved benchmark results to %s", ga_benchmark.save(results))
+
+    if baseline:
+        regressions = compare(results, load_results(baseline), tolerance)
+        for regression in regressions:
+            logger.warning("Regression: %s", regression)
+        if len(regressions) > 0:
+            exit(1)
+        logger.info("No regressions compared to %s", baseline)
@@ -5,3 +5,33 @@ CROSSOVER_COMPOSITION_RATE = 0
 
 POPULATION_INJECTION_RATE = 0
 POPULATION_INJECTION_SIZE = 2
+
+NOVELTY_RETRIES = 10  # Re-mutations of an offspring that was already evaluated
+POPULATION_MAX_ATTEMPTS = 20  # Random draws per requested member before giving up on novel random scenarios
+
+MAX_PARALLEL_SCENARIOS = 1
+
+TOURNAMENT_SIZE = 3
+SELECTION_PRESSURE = 1.5
+
+DISCOVERY_PAGE_SIZE = 500
+DISCOVERY_MAX_WORKERS = 10
+DISCOVERY_MAX_RESTARTS = 3  # Paged pod listings started over after their continue token expired
+
+HTTP_STATUS_GONE = 410
+
+CLUSTER_WATCH_TIMEOUT = 300  # in seconds, watch requests are restarted after this
+CLUSTER_WATCH_RETRY_DELAY = 5  # in seconds
+
+IMAGE_PULL_MAX_WORKERS = 4  # Concurrent image pulls before the run
+
+LOG_TAIL_LINES = 100  # Lines of scenario output kept in memory for error reporting
+
+STOP_GRACE_PERIOD = 30  # in seconds, time an interrupted scenario has to clean up before it is killed
+HEALTH_CHECK_SNAPSHOT_TIMEOUT = 5  # in seconds, wait for health check results of a running scenario
+PROMETHEUS_QUERY_TIMEOUT = 60  # in seconds, for fitness range queries
+
+BENCHMARK_CLUSTER_SIZES = [(10, 100), (100, 1000), (1000, 10000), (5000, 50000)]  # (nodes, pods)
+BENCHMARK_ITERATIONS = 200  # Operations per stage and cluster size
+BENCHMARK_POPULATION_SIZE = 20
+BENCHMARK_TOLERANCE = 0.2  # Allowed throughput drop compared to baseline
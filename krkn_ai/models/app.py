@@ -1,12 +1,12 @@
 import logging
 import datetime
 from enum import Enum
-from typing import Dict, List
+from typing import Dict, List, Optional
 from dataclasses import dataclass
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, field_serializer, field_validator
 
 from krkn_ai.models.scenario.base import BaseScenario
-from krkn_ai.models.config import HealthCheckResult
+from krkn_ai.models.health_check import HealthCheckSeries
 from krkn_ai.utils import id_generator
 
 
@@ -22,8 +22,22 @@ class FitnessScoreResult(BaseModel):
     weighted_score: float
 
 
+class HealthCheckScoreResult(BaseModel):
+    name: str
+    url: str
+    samples: int = 0        # Total number of health check requests
+    failures: int = 0       # Number of requests which did not return the expected status code
+    failure_rate: float = 0.0
+    outliers: int = 0       # Number of response time outliers (above Q3 + 1.5 * IQR)
+    p50: Optional[float] = None   # Response time percentiles of successful requests, in seconds
+    p95: Optional[float] = None
+    p99: Optional[float] = None
+    error_budget_burn: float = 0.0  # Failure rate relative to the allowed failure rate of the availability target
+
+
 class FitnessResult(BaseModel):
     scores: List[FitnessScoreResult] = []
+    health_check_scores: List[HealthCheckScoreResult] = []  # Per application health check breakdown
     health_check_failure_score: float = 0.0 # Health check failure score
     health_check_response_time_score: float = 0.0 # Health check response time score
     krkn_failure_score: float = 0.0 # Krkn failure score
@@ -32,18 +46,38 @@ class FitnessResult(BaseModel):
 
 
 class CommandRunResult(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     generation_id: int      # Which generation was scenario referred
     scenario_id: int = Field(default_factory=lambda: next(auto_id))        # Scenario ID
     scenario: BaseScenario  # scenario details
     cmd: str                # Krkn-Hub command 
-    log: str                # Log details or path to log file
+    log: str                # Path to log file
     returncode: int         # Return code of Krkn-Hub scenario execution
     start_time: datetime.datetime   # Start date timestamp of the test 
     end_time: datetime.datetime     # End date timestamp of the test
     fitness_result: FitnessResult   # Fitness result measured for scenario.
-    health_check_results: Dict[str, List[HealthCheckResult]] = {}
+    health_check_results: Dict[str, HealthCheckSeries] = {}  # Map between URL and its health check samples
+    truncated: bool = False  # Scenario was stopped before the end of its duration by the early stop policy
+
+    @field_validator('health_check_results', mode='before')
+    @classmethod
+    def to_health_check_series(cls, value):
+        # Accept serialized results, i.e. lists of HealthCheckResult per URL
+        return {
+            url: results if isinstance(results, HealthCheckSeries) else HealthCheckSeries.from_results(results)
+            for url, results in value.items()
+        }
+
+    @field_serializer('health_check_results')
+    def serialize_health_check_results(self, value: Dict[str, HealthCheckSeries]):
+        return {
+            url: [result.model_dump() for result in series.to_results()]
+            for url, series in value.items()
+        }
 
 
 class KrknRunnerType(str, Enum):
     HUB_RUNNER = "HUB_RUNNER"
     CLI_RUNNER = "CLI_RUNNER"
+    SIMULATED_RUNNER = "SIMULATED_RUNNER"
@@ -1,6 +1,8 @@
 from enum import Enum
-from typing import Dict, List, Optional, Union
-from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Dict, List, Optional, Set, Tuple, Union
+from pydantic import BaseModel, Field, PrivateAttr, field_validator, model_validator
+
+from krkn_ai.utils.rng import rng
 
 class Container(BaseModel):
     name: str
@@ -22,6 +24,79 @@ class Node(BaseModel):
     interfaces: List[str] = []
 
 
+class ClusterComponentsIndex:
+    '''
+    Precomputed lookups over cluster components used by scenarios for O(1) random draws.
+    '''
+    __slots__ = (
+        "namespaces_with_pods", "pods", "namespace_pod_labels", "pod_names",
+        "nodes", "nodes_with_interfaces", "nodes_by_label", "node_labels", "node_names",
+    )
+
+    def __init__(self, components: "ClusterComponents"):
+        # Namespaces having at least one pod, and flat list of (namespace, pod)
+        self.namespaces_with_pods: List[Namespace] = [ns for ns in components.namespaces if len(ns.pods) > 0]
+        self.pods: List[Tuple[Namespace, Pod]] = [(ns, pod) for ns in components.namespaces for pod in ns.pods]
+
+        # Unique "key=value" pod labels of each namespace
+        self.namespace_pod_labels: Dict[str, List[str]] = {}
+        for ns in self.namespaces_with_pods:
+            labels = dict.fromkeys(f"{label}={value}" for pod in ns.pods for label, value in pod.labels.items())
+            self.namespace_pod_labels[ns.name] = list(labels)
+
+        # Pod names of each namespace having pods, and names of all nodes
+        self.pod_names: Dict[str, Set[str]] = {ns.name: {pod.name for pod in ns.pods} for ns in self.namespaces_with_pods}
+        self.node_names: Set[str] = {node.name for node in components.nodes}
+
+        self.nodes: List[Node] = list(components.nodes)
+        self.nodes_with_interfaces: List[Node] = [node for node in components.nodes if len(node.interfaces) > 0]
+
+        # Map between "key=value" node label and nodes having it
+        self.nodes_by_label: Dict[str, List[Node]] = {}
+        for node in components.nodes:
+            for label, value in node.labels.items():
+                self.nodes_by_label.setdefault(f"{label}={value}", []).append(node)
+        self.node_labels: List[str] = list(self.nodes_by_label)
+
+    def random_namespace(self) -> Namespace:
+        '''Random namespace having pods, every namespace is equally likely.'''
+        return rng.pick(self.namespaces_with_pods)
+
+    def random_pod(self) -> Tuple[Namespace, Pod]:
+        '''Random pod across all namespaces along with its namespace.'''
+        return rng.pick(self.pods)
+
+    def random_node_label(self) -> Tuple[str, int]:
+        '''Random "key=value" node label and number of nodes having it.'''
+        label = rng.pick(self.node_labels)
+        return label, len(self.nodes_by_label[label])
+
+    def node_selector_count(self) -> int:
+        '''
+        Distinct node selectors with number of nodes of node hog scenarios: a single node by hostname,
+        or a node label with [1, nodes) of its nodes.
+        '''
+        count = sum(max(1, len(nodes) - 1) for nodes in self.nodes_by_label.values())
+        # Single nodes which are not already selected by their own hostname label
+        count += sum(
+            1 for node in self.nodes
+            if len(self.nodes_by_label.get(f"kubernetes.io/hostname={node.name}", [])) != 1
+        )
+        return count
+
+
 class ClusterComponents(BaseModel):
     namespaces: List[Namespace] = []
     nodes: List[Node] = []
+
+    _index: Optional[ClusterComponentsIndex] = PrivateAttr(default=None)
+
+    @property
+    def index(self) -> ClusterComponentsIndex:
+        '''
+        Selection index, built on first use.
+        Components are not expected to change afterwards, a refreshed cluster state is a new object.
+        '''
+        if self._index is None:
+            self._index = ClusterComponentsIndex(self)
+        return self._index
@@ -1,7 +1,7 @@
 import datetime
 from enum import Enum
 from typing import Dict, List, Optional, Union
-from pydantic import BaseModel, Field, field_validator, model_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 import krkn_ai.constants as const
 from krkn_ai.models.cluster_components import ClusterComponents
 from krkn_ai.utils import id_generator
@@ -32,6 +32,9 @@ class DnsOutageScenarioConfig(BaseModel):
     enable: bool = False
 
 class ScenarioConfig(BaseModel):
+    # Allow loading config saved by Krkn-AI which uses field names instead of aliases
+    model_config = ConfigDict(populate_by_name=True)
+
     application_outages: Optional[AppOutageScenarioConfig] = Field(
         alias="application-outages", default=None
     )
@@ -63,6 +66,23 @@ class FitnessFunctionType(str, Enum):
     range = 'range'
 
 
+class EvolutionMode(str, Enum):
+    generational = 'generational'   # Evaluate whole population before breeding next generation
+    steady_state = 'steady_state'   # Breed a replacement as soon as any evaluation finishes
+
+
+class SelectionStrategy(str, Enum):
+    roulette = 'roulette'       # Probability proportional to fitness (shifted when negative)
+    tournament = 'tournament'   # Fittest of tournament_size random members
+    rank = 'rank'               # Linear ranking, probability depends on rank only
+    sus = 'sus'                 # Stochastic universal sampling, evenly spaced pointers over the roulette wheel
+
+
+class ConvergenceAction(str, Enum):
+    stop = 'stop'       # Stop the run
+    restart = 'restart' # Replace part of the population with random scenarios
+
+
 auto_id = id_generator()
 
 
@@ -106,20 +126,151 @@ class HealthCheckApplicationConfig(BaseModel):
     status_code: int = 200  # Expected status code
     timeout: int = 4   # in seconds
     interval: int = 2   # in seconds
+    jitter: float = 0.0  # in seconds, random delay added to each scheduled request
+    availability_target: float = 0.99  # Expected ratio of successful requests, used for error budget burn
+
+    @field_validator('availability_target', mode='after')
+    @classmethod
+    def is_ratio(cls, value: float) -> float:
+        if value <= 0 or value >= 1:
+            raise ValueError(f'availability_target should be in the range (0.0, 1.0), got {value}')
+        return value
 
 class HealthCheckConfig(BaseModel):
     stop_watcher_on_failure: bool = False
+    max_connections_per_host: int = 4   # Keep-alive connections and concurrent requests per host
+    max_workers: int = 32   # Maximum number of requests in flight across all applications
     applications: List[HealthCheckApplicationConfig] = []
 
 class HealthCheckResult(BaseModel):
     name: str
-    timestamp: str = Field(default_factory=lambda: datetime.datetime.now().isoformat())
+    timestamp: str = Field(default_factory=lambda: datetime.datetime.now().isoformat())   # Time the request was sent
+    received_timestamp: Optional[str] = None    # Time the response (or error) was received
     response_time: float  # in seconds
     status_code: int    # actual status code
     success: bool       # True if status code is as expected
     error: Optional[str] = None # Error message if the status code is not as expected
 
 
+class EarlyStopConfig(BaseModel):
+    '''
+    Stop scenarios whose fitness score has settled before their configured duration ends.
+    '''
+    enable: bool = False
+    min_duration: int = 60  # in seconds, scenarios always run at least this long
+    check_interval: int = 15    # in seconds, time between fitness score estimates
+    window: int = 3     # Number of consecutive estimates that must agree
+    tolerance: float = 0.05  # Maximum change of the estimates within the window, relative to the latest estimate
+    min_delta: float = 0.01  # Maximum change of the estimates within the window allowed regardless of tolerance
+    min_score: float = 0.1  # Estimates below this score (e.g. before chaos takes effect) never count as settled
+    stop_on_health_check_failure: bool = True  # Stop when all health checks failed during the whole window
+
+    @field_validator('check_interval', 'window', mode='after')
+    @classmethod
+    def is_positive(cls, value: int) -> int:
+        if value < 1:
+            raise ValueError(f'value should be at least 1, got {value}')
+        return value
+
+
+class FitnessCacheConfig(BaseModel):
+    '''
+    Persistent cache of fitness results shared across Krkn-AI runs.
+    '''
+    enable: bool = False
+    path: Optional[str] = None  # Path to SQLite file, defaults to <output_dir>/fitness_cache.db
+    ttl: int = 86400    # in seconds, 0 means cached results never expire
+
+
+class SelectionConfig(BaseModel):
+    '''
+    Strategy used to select parents for breeding.
+    '''
+    strategy: SelectionStrategy = SelectionStrategy.roulette
+    tournament_size: int = const.TOURNAMENT_SIZE  # Members competing in each tournament
+    selection_pressure: float = const.SELECTION_PRESSURE  # Expected offsprings of the best member in rank selection (1.0-2.0)
+
+    @field_validator('tournament_size', mode='after')
+    @classmethod
+    def is_positive(cls, value: int) -> int:
+        if value < 1:
+            raise ValueError(f'tournament_size should be at least 1, got {value}')
+        return value
+
+    @field_validator('selection_pressure', mode='after')
+    @classmethod
+    def is_pressure(cls, value: float) -> float:
+        if value < 1 or value > 2:
+            raise ValueError(f'selection_pressure should be in the range [1.0, 2.0], got {value}')
+        return value
+
+
+class SurrogateConfig(BaseModel):
+    '''
+    Pre-screen offsprings with a k-nearest neighbours model trained on evaluated scenarios,
+    only the most promising ones are run on the cluster.
+    '''
+    enable: bool = False
+    oversampling: int = 4   # Offsprings bred for every offspring that gets evaluated
+    neighbors: int = 5      # Number of nearest evaluated scenarios used for a prediction
+    exploration: float = 1.0    # Weight of prediction uncertainty, higher values prefer scenarios unlike the evaluated ones
+    min_samples: int = 10   # Evaluated scenarios required before offsprings are screened
+
+    @field_validator('oversampling', 'neighbors', mode='after')
+    @classmethod
+    def is_positive(cls, value: int) -> int:
+        if value < 1:
+            raise ValueError(f'value should be at least 1, got {value}')
+        return value
+
+
+class ConvergenceConfig(BaseModel):
+    '''
+    Detect generations that no longer find anything new and stop the run or restart the population.
+    '''
+    enable: bool = False
+    patience: int = 5   # Generations without best fitness improvement before converging, 0 disables
+    min_improvement: float = 0.0    # Smaller improvements of best fitness are not counted as improvement
+    min_diversity: float = 0.2  # Converged when the ratio of unique scenarios in a generation drops below this
+    max_cache_hit_rate: float = 0.9  # Converged when a larger ratio of a generation was already evaluated
+    action: ConvergenceAction = ConvergenceAction.stop
+    restart_rate: float = 0.5   # Ratio of the next population replaced by random scenarios on restart
+    max_restarts: int = 3   # Restarts before the run is stopped
+
+    @field_validator('min_diversity', 'max_cache_hit_rate', 'restart_rate', mode='after')
+    @classmethod
+    def is_ratio(cls, value: float) -> float:
+        if value < 0 or value > 1:
+            raise ValueError(f'value should be in the range [0.0, 1.0], got {value}')
+        return value
+
+
+class ClusterWatchConfig(BaseModel):
+    '''
+    Keep cluster components up to date during the run using Kubernetes watches.
+    '''
+    enable: bool = False
+    namespace: Optional[str] = None  # Namespace(s) to track, supports regex and comma separated values. Defaults to namespaces in cluster_components
+    pod_label: str = ".*"   # Pod label key(s) to keep, supports regex and comma separated values
+    node_label: str = ".*"  # Node label key(s) to keep, supports regex and comma separated values
+
+
+class SimulatorConfig(BaseModel):
+    '''
+    Synthetic cluster used by the simulated runner to run the genetic algorithm offline.
+    '''
+    seed: int = 0   # Seed of the fitness landscape, the same seed always gives the same landscape
+    scenario_weights: Dict[str, float] = {}    # Base fitness per scenario name, drawn from seed when not set
+    parameter_weights: Dict[str, float] = {}   # Fitness amplitude per parameter name, defaults to 1.0
+    composition_bonus: float = 1.0  # Multiplier of the combined fitness of composite scenarios
+    noise: float = 0.0  # Standard deviation of gaussian noise added to every evaluation
+    krkn_failure_rate: float = 0.1  # Ratio of scenarios that fail with SLOs not met (status code 2)
+    health_check_impact: float = 0.2    # Maximum failure rate caused on a health checked application
+    response_time: float = 0.05  # in seconds, median response time of health checks without chaos
+    duration: int = 60  # in seconds, simulated duration of scenarios without a duration parameter
+    report_scenarios: bool = False  # Save result, health check graph and csv row of every simulated scenario
+
+
 class ConfigFile(BaseModel):
     kubeconfig_file_path: str  # Path to kubeconfig
     parameters: Dict[str, str] = {}
@@ -134,10 +285,31 @@ class ConfigFile(BaseModel):
 
     population_injection_rate: float = const.POPULATION_INJECTION_RATE  # How often a random samples gets added to new population (0.0-1.0)
     population_injection_size: int = const.POPULATION_INJECTION_SIZE    # What's the size of random samples that gets added to new population
+    novelty_retries: int = const.NOVELTY_RETRIES  # Re-mutations of an offspring that was already evaluated, 0 disables
+
+    max_parallel_scenarios: int = const.MAX_PARALLEL_SCENARIOS  # Maximum number of scenarios evaluated concurrently
+    prepull_images: bool = False  # Pull images of enabled scenarios before the first generation (krknhub runner only)
+    compress_logs: bool = False  # Store scenario logs gzip compressed (scenario_<id>.log.gz)
+    evolution_mode: EvolutionMode = EvolutionMode.generational  # generational or steady_state
+    selection: SelectionConfig = SelectionConfig()
+    surrogate: SurrogateConfig = SurrogateConfig()
+    convergence: ConvergenceConfig = ConvergenceConfig()
+    multi_objective: bool = False  # NSGA-II over SLO items, krkn failure and health check scores instead of their weighted sum
 
     fitness_function: FitnessFunction
     health_checks: HealthCheckConfig = HealthCheckConfig()
+    early_stop: EarlyStopConfig = EarlyStopConfig()
+    fitness_cache: FitnessCacheConfig = FitnessCacheConfig()
+    cluster_watch: ClusterWatchConfig = ClusterWatchConfig()
+    simulator: SimulatorConfig = SimulatorConfig()
 
     scenario: ScenarioConfig = ScenarioConfig()
 
     cluster_components: ClusterComponents
+
+    @field_validator('max_parallel_scenarios', mode='after')
+    @classmethod
+    def is_positive(cls, value: int) -> int:
+        if value < 1:
+            raise ValueError(f'max_parallel_scenarios should be at least 1, got {value}')
+        return value
@@ -0,0 +1,119 @@
+import datetime
+from array import array
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from krkn_ai.models.config import HealthCheckResult
+
+
+class HealthCheckSeries:
+    '''
+    Compact columnar storage of health check samples for a single URL.
+
+    Samples are kept in typed arrays instead of one pydantic model per probe,
+    HealthCheckResult models are only created when results are serialized.
+    '''
+    __slots__ = ("name", "sent", "received", "response_time", "status_code", "success", "errors")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.sent = array("d")           # Time the request was sent (epoch seconds)
+        self.received = array("d")       # Time the response was received (epoch seconds, nan if unknown)
+        self.response_time = array("d")  # in seconds, -1 if request failed
+        self.status_code = array("i")    # actual status code, -1 if request failed
+        self.success = array("b")        # 1 if status code is as expected
+        self.errors: Dict[int, str] = {}  # Map between sample index and error message
+
+    def __len__(self):
+        return len(self.sent)
+
+    def append(
+        self,
+        sent: float,
+        received: float,
+        response_time: float,
+        status_code: int,
+        success: bool,
+        error: Optional[str] = None
+    ):
+        if error is not None:
+            self.errors[len(self.sent)] = error
+        self.sent.append(sent)
+        self.received.append(received)
+        self.response_time.append(response_time)
+        self.status_code.append(status_code)
+        self.success.append(1 if success else 0)
+
+    def extend(self, other: "HealthCheckSeries"):
+        offset = len(self)
+        for idx, error in other.errors.items():
+            self.errors[offset + idx] = error
+        self.sent.extend(other.sent)
+        self.received.extend(other.received)
+        self.response_time.extend(other.response_time)
+        self.status_code.extend(other.status_code)
+        self.success.extend(other.success)
+
+    def sort(self):
+        '''Sort samples by send time.'''
+        order = np.argsort(self.sent_array(), kind="stable")
+        if np.all(order[:-1] < order[1:]):
+            return
+        for column in ("sent", "received", "response_time", "status_code", "success"):
+            values = getattr(self, column)
+            sorted_values = array(values.typecode)
+            sorted_values.frombytes(np.frombuffer(values, dtype=values.typecode)[order].tobytes())
+            setattr(self, column, sorted_values)
+        position = {int(old): new for new, old in enumerate(order)}
+        self.errors = {position[idx]: error for idx, error in self.errors.items()}
+
+    # Zero-copy NumPy views over the columns
+    def sent_array(self) -> np.ndarray:
+        return np.frombuffer(self.sent, dtype=self.sent.typecode)
+
+    def received_array(self) -> np.ndarray:
+        return np.frombuffer(self.received, dtype=self.received.typecode)
+
+    def response_time_array(self) -> np.ndarray:
+        return np.frombuffer(self.response_time, dtype=self.response_time.typecode)
+
+    def status_code_array(self) -> np.ndarray:
+        return np.frombuffer(self.status_code, dtype=self.status_code.typecode)
+
+    def success_array(self) -> np.ndarray:
+        return np.frombuffer(self.success, dtype=self.success.typecode).astype(bool)
+
+    def to_results(self) -> List[HealthCheckResult]:
+        '''Materialize samples as HealthCheckResult models.'''
+        results = []
+        for i in range(len(self)):
+            received = self.received[i]
+            results.append(HealthCheckResult(
+                name=self.name,
+                timestamp=datetime.datetime.fromtimestamp(self.sent[i]).isoformat(),
+                received_timestamp=None if np.isnan(received) else datetime.datetime.fromtimestamp(received).isoformat(),
+                response_time=self.response_time[i],
+                status_code=self.status_code[i],
+                success=bool(self.success[i]),
+                error=self.errors.get(i),
+            ))
+        return results
+
+    @classmethod
+    def from_results(cls, results: List[HealthCheckResult], name: str = "") -> "HealthCheckSeries":
+        results = [HealthCheckResult(**x) if isinstance(x, dict) else x for x in results]
+        series = cls(results[0].name if len(results) > 0 else name)
+        for result in results:
+            received = float("nan")
+            if result.received_timestamp is not None:
+                received = datetime.datetime.fromisoformat(result.received_timestamp).timestamp()
+            series.append(
+                sent=datetime.datetime.fromisoformat(result.timestamp).timestamp(),
+                received=received,
+                response_time=result.response_time,
+                status_code=result.status_code,
+                success=result.success,
+                error=result.error,
+            )
+        return series
@@ -1,7 +1,36 @@
+import math
+import functools
 from enum import Enum
 from pydantic import BaseModel, PrivateAttr
 from krkn_ai.models.cluster_components import ClusterComponents
-from typing import Any
+from krkn_ai.utils import sha256_digest
+from typing import Any, Iterable, Optional, Set, Tuple
+
+
+def scenario_fingerprint(name: str, parameters: Iterable[Tuple[str, Any]]) -> str:
+    '''Fingerprint of a scenario from its name and active (parameter name, value) pairs.'''
+    return sha256_digest({
+        "name": name,
+        "parameters": [[param_name, str(value)] for param_name, value in parameters],
+    })
+
+
+def composite_fingerprint(name: str, dependency: "CompositeDependency", fingerprint_a: str, fingerprint_b: str) -> str:
+    '''
+    Fingerprint of a composite scenario from the fingerprints of its branches.
+    Branches are unordered for independent scenarios, and B_ON_A(a, b) is the same as A_ON_B(b, a).
+    '''
+    branches = [fingerprint_a, fingerprint_b]
+    if dependency == CompositeDependency.NONE:
+        branches.sort()
+    elif dependency == CompositeDependency.B_ON_A:
+        dependency = CompositeDependency.A_ON_B
+        branches.reverse()
+    return sha256_digest({
+        "name": name,
+        "dependency": dependency.value,
+        "scenarios": branches,
+    })
 
 
 class BaseParameter(BaseModel):
@@ -23,31 +52,149 @@ class BaseScenario(BaseModel):
     krknctl_name: str  # Name of the scenario in krknctl
     krknhub_image: str  # Image of the scenario in krknhub
 
+    @property
+    def fingerprint(self) -> str:
+        '''
+        Canonical content hash of the scenario, stable across processes.
+        Used for equality, hashing and as persistent key of scenario results.
+        '''
+        return sha256_digest({"name": self.name})
+
+    def get_targets(self) -> Set[str]:
+        '''
+        Cluster resources disrupted by the scenario, in the form "namespace:<name>" or "node:<name>".
+        "node:*" is used when the affected nodes are only known at runtime (e.g. label selectors).
+        '''
+        return set()
+
+    def conflicts_with(self, other: "BaseScenario") -> bool:
+        '''
+        Whether two scenarios disrupt overlapping cluster resources and
+        therefore should not run at the same time.
+        '''
+        targets = self.get_targets()
+        other_targets = other.get_targets()
+        if len(targets & other_targets) > 0:
+            return True
+        # A wildcard node target overlaps with any other node target
+        self_nodes = any(x.startswith("node:") for x in targets)
+        other_nodes = any(x.startswith("node:") for x in other_targets)
+        if ("node:*" in targets and other_nodes) or ("node:*" in other_targets and self_nodes):
+            return True
+        return False
+
 
 class Scenario(BaseScenario):
 
     # Private attribute doesn't appear when serializing, but lets us keep referene 
     _cluster_components: ClusterComponents = PrivateAttr()
+    _fingerprint: Optional[str] = PrivateAttr(default=None)
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Mutation changes parameter values, cached fingerprint is dropped afterwards
+        mutate = cls.__dict__.get("mutate")
+        if mutate is not None:
+            @functools.wraps(mutate)
+            def mutate_and_invalidate(self, *args, **kwargs):
+                try:
+                    return mutate(self, *args, **kwargs)
+                finally:
+                    self.invalidate_fingerprint()
+            cls.mutate = mutate_and_invalidate
 
     def __init__(self, **data):
         cluster_components = data.pop("cluster_components")
         super().__init__(**data)
         self._cluster_components = cluster_components
 
+    def __deepcopy__(self, memo=None):
+        # Cluster components (and their selection index) are shared between scenarios, not copied
+        memo = {} if memo is None else memo
+        cluster_components = getattr(self, "_cluster_components", None)
+        if cluster_components is not None:
+            memo[id(cluster_components)] = cluster_components
+        return super().__deepcopy__(memo)
+
     def __str__(self):
         param_value = ", ".join([str(x.value) for x in self.parameters])
         return f"{self.name}({param_value})"
 
+    @classmethod
+    def search_space_size(cls, cluster_components: ClusterComponents) -> float:
+        '''
+        Estimated number of distinct scenarios of this type that can be generated for the cluster,
+        infinite unless the scenario type provides an estimate. Estimates are upper bounds.
+        '''
+        return math.inf
+
+    def get_targets(self) -> Set[str]:
+        targets = set()
+        params = {x.name: x.value for x in self.parameters}
+        if params.get("NAMESPACE"):
+            targets.add(f"namespace:{params['NAMESPACE']}")
+        if params.get("NODE_NAME"):
+            targets.add(f"node:{params['NODE_NAME']}")
+        node_selector = params.get("NODE_SELECTOR")
+        if node_selector is not None:
+            if node_selector.startswith("kubernetes.io/hostname="):
+                targets.add("node:%s" % node_selector.split("=", 1)[1])
+            else:
+                targets.add("node:*")
+        if params.get("OBJECT_TYPE") == "node":
+            targets.add("node:*")
+        return targets
+
+    def targets_exist(self) -> bool:
+        '''
+        Whether the namespace, pod, node and label targets of the scenario exist in its cluster components.
+        Values inherited from parents while breeding may refer to components that were removed since.
+        '''
+        index = self._cluster_components.index
+        params = {x.name: x.value for x in self.parameters}
+        namespace = params.get("NAMESPACE")
+        if namespace:
+            if namespace not in index.pod_names:
+                return False
+            if params.get("POD_NAME") and params["POD_NAME"] not in index.pod_names[namespace]:
+                return False
+            for name in ("POD_LABEL", "LABEL_SELECTOR"):
+                if params.get(name) and params[name] not in index.namespace_pod_labels[namespace]:
+                    return False
+        elif params.get("LABEL_SELECTOR") and params.get("OBJECT_TYPE") == "node":
+            if params["LABEL_SELECTOR"] not in index.nodes_by_label:
+                return False
+        if params.get("NODE_NAME") and params["NODE_NAME"] not in index.node_names:
+            return False
+        node_selector = params.get("NODE_SELECTOR")
+        if node_selector:
+            if node_selector.startswith("kubernetes.io/hostname="):
+                if node_selector.split("=", 1)[1] not in index.node_names:
+                    return False
+            elif node_selector not in index.nodes_by_label:
+                return False
+        return True
+
+    @property
+    def fingerprint(self) -> str:
+        # Private attributes are read from __pydantic_private__ directly, attribute lookup is much slower
+        fingerprint = self.__pydantic_private__.get("_fingerprint")
+        if fingerprint is None:
+            fingerprint = scenario_fingerprint(self.name, ((x.name, x.value) for x in self.parameters))
+            self.__pydantic_private__["_fingerprint"] = fingerprint
+        return fingerprint
+
+    def invalidate_fingerprint(self):
+        '''Has to be called when parameter values are changed outside of mutate.'''
+        self.__pydantic_private__["_fingerprint"] = None
+
     def __eq__(self, other):
         if not isinstance(other, Scenario):
             return NotImplemented
-        self_params = ", ".join([str(x.value) for x in self.parameters])
-        other_params = ", ".join([str(x.value) for x in other.parameters])
-        return self.name == other.name and self_params == other_params
+        return self.fingerprint == other.fingerprint
 
     def __hash__(self):
-        self_params = ", ".join([str(x.value) for x in self.parameters])
-        return hash((self.name, self_params))
+        return int(self.fingerprint[:16], 16)
 
 
 class CompositeDependency(Enum):
@@ -68,10 +215,30 @@ class CompositeScenario(BaseScenario):
     def __str__(self):
         return f"{self.name}"
 
+    def get_targets(self) -> Set[str]:
+        return self.scenario_a.get_targets() | self.scenario_b.get_targets()
+
+    _fingerprint_cache: Optional[tuple] = PrivateAttr(default=None)
+
+    @property
+    def fingerprint(self) -> str:
+        '''
+        Derived from the fingerprints of both branches (which are cached themselves).
+        '''
+        fingerprint_a = self.scenario_a.fingerprint
+        fingerprint_b = self.scenario_b.fingerprint
+        cache = self.__pydantic_private__.get("_fingerprint_cache")
+        if cache is not None and cache[:3] == (self.dependency, fingerprint_a, fingerprint_b):
+            return cache[3]
+
+        fingerprint = composite_fingerprint(self.name, self.dependency, fingerprint_a, fingerprint_b)
+        self.__pydantic_private__["_fingerprint_cache"] = (self.dependency, fingerprint_a, fingerprint_b, fingerprint)
+        return fingerprint
+
     def __eq__(self, other):
         if not isinstance(other, CompositeScenario):
             return NotImplemented
-        return self.name == other.name and hash(other) == hash(self)
+        return self.fingerprint == other.fingerprint
 
     def __hash__(self):
-        return hash(tuple([self.scenario_a, self.scenario_b]))
+        return int(self.fingerprint[:16], 16)
@@ -54,6 +54,17 @@ class ScenarioFactory:
         except Exception as error:
             raise ScenarioInitError("Unable to initialize scenario: %s", error)
 
+    @staticmethod
+    def search_space_size(config: ConfigFile) -> float:
+        '''
+        Estimated number of distinct non-composite scenarios of the enabled scenario types.
+        Parameters are counted as independent, so this is an upper bound of the reachable scenarios.
+        '''
+        return sum(
+            cls.search_space_size(config.cluster_components)
+            for _, cls in ScenarioFactory.list_scenarios(config)
+        )
+
     @staticmethod
     def create_dummy_scenario():
         return DummyScenario(cluster_components=ClusterComponents())
@@ -0,0 +1,252 @@
+'''
+Compact genome representation of scenarios used while breeding.
+
+A genome keeps the scenario type and a tuple of parameter values instead of a tree of
+pydantic models. Crossover, mutation, deduplication and surrogate screening work on
+genomes, only the offsprings selected for evaluation are materialized into Scenario
+objects. Genomes have the same fingerprint as the scenario they materialize into, so
+they can be looked up among evaluated scenarios directly.
+'''
+
+from typing import Any, Dict, List, Tuple, Type, Union
+
+from pydantic import BaseModel
+
+from krkn_ai.models.cluster_components import ClusterComponents
+from krkn_ai.models.scenario.base import (
+    BaseParameter,
+    BaseScenario,
+    CompositeDependency,
+    CompositeScenario,
+    Scenario,
+    composite_fingerprint,
+    scenario_fingerprint,
+)
+
+
+class ScenarioLayout:
+    '''
+    Parameter layout of a scenario class, computed once per class without running mutate.
+    '''
+    __slots__ = (
+        "type_id", "scenario_cls", "name", "fields", "size", "param_names", "param_types", "defaults", "position",
+        "_scratch",
+    )
+
+    def __init__(self, type_id: int, scenario_cls: Type[Scenario]):
+        self.type_id = type_id
+        self.scenario_cls = scenario_cls
+
+        prototype = scenario_cls.model_construct()
+        self.name: str = prototype.name
+        params = prototype.parameters
+        field_by_id = {id(getattr(prototype, name)): name for name in scenario_cls.model_fields}
+
+        # Active parameters come first, followed by parameter fields not listed in scenario.parameters
+        fields = [field_by_id[id(param)] for param in params]
+        fields += [
+            name for name in scenario_cls.model_fields
+            if name not in fields and isinstance(getattr(prototype, name), BaseParameter)
+        ]
+        self.fields: Tuple[str, ...] = tuple(fields)
+        self.size = len(params)  # Number of active parameters
+        self.param_names: Tuple[str, ...] = tuple(getattr(prototype, name).name for name in fields)
+        self.param_types: Tuple[type, ...] = tuple(type(getattr(prototype, name)) for name in fields)
+        self.defaults = tuple(getattr(prototype, name) for name in fields)  # Copied when materializing
+
+        # First occurrence wins, same as looking up a parameter by name in scenario.parameters
+        self.position: Dict[str, int] = {}
+        for i, name in enumerate(self.param_names[:self.size]):
+            self.position.setdefault(name, i)
+        self._scratch = None
+
+    def load(self, values: Tuple[Any, ...], cluster_components: ClusterComponents) -> Scenario:
+        '''
+        Scenario of this layout holding values, used to run scenario methods on a genome.
+        The same scenario is reused for every call, it is only valid until the next one.
+        '''
+        scenario = self._scratch
+        if scenario is None:
+            scenario = self._scratch = self.scenario_cls.model_construct(
+                **{field: default.model_copy() for field, default in zip(self.fields, self.defaults)}
+            )
+        for field, value in zip(self.fields, values):
+            # Model values (e.g. network params) are mutated in place, genome keeps its own copy
+            if isinstance(value, BaseModel):
+                value = value.model_copy()
+            getattr(scenario, field).value = value
+        scenario._cluster_components = cluster_components
+        scenario.invalidate_fingerprint()
+        return scenario
+
+    def compatible_parameters(self, other: "ScenarioLayout") -> List[str]:
+        '''
+        Parameters with the same name and type in both layouts.
+        Parameters sharing a name across scenarios don't always hold the same kind of
+        value (e.g. EGRESS), these are never exchanged.
+        '''
+        return [
+            name for name, i in self.position.items()
+            if name in other.position and self.param_types[i] is other.param_types[other.position[name]]
+        ]
+
+
+_layouts: List[ScenarioLayout] = []
+_type_ids: Dict[type, int] = {}
+
+
+def layout_of(scenario_cls: Type[Scenario]) -> ScenarioLayout:
+    type_id = _type_ids.get(scenario_cls)
+    if type_id is None:
+        type_id = len(_layouts)
+        _layouts.append(ScenarioLayout(type_id, scenario_cls))
+        _type_ids[scenario_cls] = type_id
+    return _layouts[type_id]
+
+
+class Genome:
+    '''
+    Scenario type id and its parameter values. Genomes are immutable, operations return new genomes.
+    '''
+    __slots__ = ("type_id", "values", "_fingerprint")
+
+    def __init__(self, type_id: int, values: Tuple[Any, ...]):
+        self.type_id = type_id
+        self.values = values
+        self._fingerprint = None
+
+    @property
+    def layout(self) -> ScenarioLayout:
+        return _layouts[self.type_id]
+
+    @property
+    def name(self) -> str:
+        return self.layout.name
+
+    @property
+    def fingerprint(self) -> str:
+        '''Same as the fingerprint of the materialized scenario.'''
+        if self._fingerprint is None:
+            layout = self.layout
+            self._fingerprint = scenario_fingerprint(
+                layout.name, zip(layout.param_names[:layout.size], self.values[:layout.size])
+            )
+        return self._fingerprint
+
+    def __eq__(self, other):
+        # Also compares equal to the materialized scenario, so genomes are found among evaluated scenarios
+        if not isinstance(other, (Genome, CompositeGenome, BaseScenario)):
+            return NotImplemented
+        return self.fingerprint == other.fingerprint
+
+    def __hash__(self):
+        return int(self.fingerprint[:16], 16)
+
+    def get(self, name: str) -> Any:
+        return self.values[self.layout.position[name]]
+
+    def replace(self, changes: Dict[str, Any]) -> "Genome":
+        values = list(self.values)
+        position = self.layout.position
+        for name, value in changes.items():
+            values[position[name]] = value
+        return Genome(self.type_id, tuple(values))
+
+    def active_values(self) -> List[Tuple[str, Any]]:
+        '''Names and values of the active parameters, in the order of scenario.parameters.'''
+        layout = self.layout
+        return list(zip(layout.param_names[:layout.size], self.values[:layout.size]))
+
+    def mutate(self, cluster_components: ClusterComponents) -> "Genome":
+        '''New genome with parameters changed by the mutate method of the scenario class.'''
+        scenario = self.layout.load(self.values, cluster_components)
+        scenario.mutate()
+        return Genome.from_scenario(scenario)
+
+    def targets_exist(self, cluster_components: ClusterComponents) -> bool:
+        return self.layout.load(self.values, cluster_components).targets_exist()
+
+    @classmethod
+    def from_scenario(cls, scenario: Scenario) -> "Genome":
+        layout = layout_of(type(scenario))
+        return cls(layout.type_id, tuple(getattr(scenario, name).value for name in layout.fields))
+
+    def to_scenario(self, cluster_components: ClusterComponents) -> Scenario:
+        layout = self.layout
+        params = {}
+        for field, default, value in zip(layout.fields, layout.defaults, self.values):
+            # Model values (e.g. network params) are mutated in place, give every scenario its own copy
+            if isinstance(value, BaseModel):
+                value = value.model_copy()
+            params[field] = default.model_copy(update={"value": value})
+        scenario = layout.scenario_cls.model_construct(**params)
+        scenario._cluster_components = cluster_components
+        return scenario
+
+
+class CompositeGenome:
+    __slots__ = ("name", "dependency", "genome_a", "genome_b", "_fingerprint")
+
+    def __init__(self, name: str, dependency: CompositeDependency, genome_a: "AnyGenome", genome_b: "AnyGenome"):
+        self.name = name
+        self.dependency = dependency
+        self.genome_a = genome_a
+        self.genome_b = genome_b
+        self._fingerprint = None
+
+    @property
+    def fingerprint(self) -> str:
+        '''Same as the fingerprint of the materialized composite scenario.'''
+        if self._fingerprint is None:
+            self._fingerprint = composite_fingerprint(
+                self.name, self.dependency, self.genome_a.fingerprint, self.genome_b.fingerprint
+            )
+        return self._fingerprint
+
+    def __eq__(self, other):
+        if not isinstance(other, (Genome, CompositeGenome, BaseScenario)):
+            return NotImplemented
+        return self.fingerprint == other.fingerprint
+
+    def __hash__(self):
+        return int(self.fingerprint[:16], 16)
+
+    def to_scenario(self, cluster_components: ClusterComponents) -> CompositeScenario:
+        return CompositeScenario(
+            name=self.name,
+            scenario_a=self.genome_a.to_scenario(cluster_components),
+            scenario_b=self.genome_b.to_scenario(cluster_components),
+            dependency=self.dependency,
+        )
+
+
+AnyGenome = Union[Genome, CompositeGenome]
+
+
+def parameter_features(scenario: Union[Scenario, Genome]) -> List[Tuple[str, Any]]:
+    '''Active parameter values of a scenario or genome, model values are flattened into one feature per field.'''
+    if isinstance(scenario, Genome):
+        params = scenario.active_values()
+    else:
+        params = [(param.name, param.value) for param in scenario.parameters]
+
+    features = []
+    for name, param_value in params:
+        if isinstance(param_value, BaseModel):
+            for key, value in param_value.model_dump().items():
+                features.append((f"{name}.{key}", value))
+        else:
+            features.append((name, param_value))
+    return features
+
+
+def encode(scenario: BaseScenario) -> AnyGenome:
+    '''Genome of a scenario, values are shared with the scenario and not copied.'''
+    if isinstance(scenario, CompositeScenario):
+        return CompositeGenome(
+            scenario.name,
+            scenario.dependency,
+            encode(scenario.scenario_a),
+            encode(scenario.scenario_b),
+        )
+    return Genome.from_scenario(scenario)
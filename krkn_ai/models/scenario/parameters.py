@@ -219,9 +219,10 @@ class NetworkScenarioNetworkParamsParameter(BaseParameter):
     value: NetworkParamData = NetworkParamData()
 
     def mutate(self):
-        self.value.latency = rng.randint(1, 1000)
+        # Model fields are assigned without validation, store plain ints instead of NumPy integers
+        self.value.latency = int(rng.randint(1, 1000))
         self.value.loss = round(rng.uniform(0.01, 0.1), 2)
-        self.value.bandwidth = rng.randint(100, 1000)
+        self.value.bandwidth = int(rng.randint(100, 1000))
 
     def get_value(self):
         return "{" + f"latency: {self.value.latency}ms,loss: {self.value.loss},bandwidth: {self.value.bandwidth}mbit" + "}"
@@ -231,9 +232,10 @@ class NetworkScenarioEgressParamsParameter(BaseParameter):
     value: NetworkParamData = NetworkParamData()
 
     def mutate(self):
-        self.value.latency = rng.randint(1, 1000)
+        # Model fields are assigned without validation, store plain ints instead of NumPy integers
+        self.value.latency = int(rng.randint(1, 1000))
         self.value.loss = round(rng.uniform(0.01, 0.1), 2)
-        self.value.bandwidth = rng.randint(100, 1000)
+        self.value.bandwidth = int(rng.randint(100, 1000))
 
     def get_value(self):
         return "{" + f"latency: {self.value.latency}ms,loss: {self.value.loss},bandwidth: {self.value.bandwidth}mbit" + "}"
@@ -1,4 +1,5 @@
 from krkn_ai.utils.rng import rng
+from krkn_ai.models.cluster_components import ClusterComponents
 from krkn_ai.models.scenario.base import Scenario
 from krkn_ai.models.scenario.parameters import *
 
@@ -30,12 +31,23 @@ class ContainerScenario(Scenario):
             self.exp_recovery_time,
         ]
 
+    @classmethod
+    def search_space_size(cls, cluster_components: ClusterComponents) -> float:
+        # Namespace and pod label, with either any container or a specific container for
+        # larger disruption counts (bounded by the largest pod having the label), and 2 kill signals.
+        # Disruption count is drawn from [1, containers)
+        combinations = {}
+        for ns, pod in cluster_components.index.pods:
+            containers = len(pod.containers)
+            count = 1 + max(0, containers - 2) * containers
+            for label, value in pod.labels.items():
+                key = (ns.name, label, value)
+                combinations[key] = max(combinations.get(key, 0), count)
+        return 2 * sum(combinations.values())
+
     def mutate(self):
-        namespace = rng.choice([
-            namespace for namespace in self._cluster_components.namespaces 
-            if len(namespace.pods) > 0
-        ])
-        pod = rng.choice(namespace.pods)
+        namespace = self._cluster_components.index.random_namespace()
+        pod = rng.pick(namespace.pods)
         labels = pod.labels
         label = rng.choice(list(labels.keys()))
 
@@ -1,6 +1,5 @@
-from collections import Counter
-
 from krkn_ai.utils.rng import rng
+from krkn_ai.models.cluster_components import ClusterComponents
 from krkn_ai.models.scenario.base import Scenario
 from krkn_ai.models.scenario.parameters import *
 
@@ -34,24 +33,26 @@ class NodeCPUHogScenario(Scenario):
             self.hog_scenario_image,
         ]
 
+    @classmethod
+    def search_space_size(cls, cluster_components: ClusterComponents) -> float:
+        # Node selector, with cpu percentage between 20 and 100
+        selectors = cluster_components.index.node_selector_count()
+        return selectors * 81
+
     def mutate(self):
-        nodes = self._cluster_components.nodes
+        index = self._cluster_components.index
 
         # scenario 1: Select a random node
         if rng.random() < 0.5:
-            node = rng.choice(nodes)
+            node = rng.pick(index.nodes)
             self.node_selector.value = f"kubernetes.io/hostname={node.name}"
             self.number_of_nodes.value = 1
             # self.node_cpu_core.value = node.free_cpu * 0.001  # convert to cores from millicores
         else:
             # scenario 2: Select a label
-            all_labels = Counter()
-            for node in nodes:
-                for label, value in node.labels.items():
-                    all_labels[f"{label}={value}"] += 1
-            label = rng.choice(list(all_labels.keys()))
+            label, node_count = index.random_node_label()
             self.node_selector.value = label
-            self.number_of_nodes.value = rng.randint(1, all_labels[label])
+            self.number_of_nodes.value = rng.randint(1, node_count)
 
             # get the minimum free cpu core for the selected label
             # min_cpu_core_milli = float('inf')
@@ -1,5 +1,5 @@
 from collections import defaultdict
-from krkn_ai.utils.rng import rng
+from krkn_ai.models.cluster_components import ClusterComponents
 from krkn_ai.models.scenario.base import Scenario
 from krkn_ai.models.scenario.parameters import *
 
@@ -33,11 +33,13 @@ class DnsOutageScenario(Scenario):
             self.ports,
         ]
 
+    @classmethod
+    def search_space_size(cls, cluster_components: ClusterComponents) -> float:
+        # Any pod in the cluster
+        return len(cluster_components.index.pods)
+
     def mutate(self):
         # Select a random pod from all pods in the cluster
-        pods = [
-            (ns, pod) for ns in self._cluster_components.namespaces for pod in ns.pods
-        ]
-        ns, pod = rng.choice(pods)
+        ns, pod = self._cluster_components.index.random_pod()
         self.namespace.value = ns.name
         self.pod_name.value = pod.name
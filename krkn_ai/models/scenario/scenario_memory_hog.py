@@ -1,6 +1,5 @@
-from collections import Counter
-
 from krkn_ai.utils.rng import rng
+from krkn_ai.models.cluster_components import ClusterComponents
 from krkn_ai.models.scenario.base import Scenario
 from krkn_ai.models.scenario.parameters import *
 
@@ -34,23 +33,25 @@ class NodeMemoryHogScenario(Scenario):
             self.hog_scenario_image,
         ]
 
+    @classmethod
+    def search_space_size(cls, cluster_components: ClusterComponents) -> float:
+        # Node selector, with 1-9 workers and memory percentage between 20 and 100
+        selectors = cluster_components.index.node_selector_count()
+        return selectors * 9 * 81
+
     def mutate(self):
-        nodes = self._cluster_components.nodes
+        index = self._cluster_components.index
 
         if rng.random() < 0.5:
             # scenario 1: Select a random node
-            node = rng.choice(nodes)
+            node = rng.pick(index.nodes)
             self.node_selector.value = f"kubernetes.io/hostname={node.name}"
             self.number_of_nodes.value = 1
         else:
             # scenario 2: Select a label
-            all_labels = Counter()
-            for node in nodes:
-                for label, value in node.labels.items():
-                    all_labels[f"{label}={value}"] += 1
-            label = rng.choice(list(all_labels.keys()))
+            label, node_count = index.random_node_label()
             self.node_selector.value = label
-            self.number_of_nodes.value = rng.randint(1, all_labels[label])
+            self.number_of_nodes.value = rng.randint(1, node_count)
 
         self.number_of_workers.mutate()
         self.node_memory_percentage.mutate()
@@ -1,5 +1,6 @@
 from collections import defaultdict
 from krkn_ai.utils.rng import rng
+from krkn_ai.models.cluster_components import ClusterComponents
 from krkn_ai.models.scenario.base import Scenario
 from krkn_ai.models.scenario.parameters import *
 
@@ -41,6 +42,13 @@ class NetworkScenario(Scenario):
             # self.wait_duration,
         ]
 
+    @classmethod
+    def search_space_size(cls, cluster_components: ClusterComponents) -> float:
+        # Node with its interface and target interface, 2 execution modes,
+        # and egress latency (1-999ms), loss (0.01-0.1) and bandwidth (100-999mbit)
+        interfaces = sum(len(node.interfaces) ** 2 for node in cluster_components.index.nodes_with_interfaces)
+        return interfaces * 2 * 999 * 10 * 900
+
     def mutate(self):
         # TODO: Add support for ingress traffic type
         self.traffic_type.value = "egress"
@@ -51,9 +59,8 @@ class NetworkScenario(Scenario):
         elif self.traffic_type.value == "egress":
             self.egress_params.mutate()
 
-        nodes = self._cluster_components.nodes
-
-        node = rng.choice(nodes)        
+        # Only nodes with known interfaces can be targeted
+        node = rng.pick(self._cluster_components.index.nodes_with_interfaces)
         self.node_name.value = node.name
         self.interfaces.value = f"[{rng.choice(node.interfaces)}]"
         self.target_node_interface.value = "{" + f"{node.name}: [{rng.choice(node.interfaces)}]" + " }"
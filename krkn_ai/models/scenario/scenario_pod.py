@@ -1,4 +1,5 @@
 from krkn_ai.utils.rng import rng
+from krkn_ai.models.cluster_components import ClusterComponents
 from krkn_ai.models.scenario.base import Scenario
 from krkn_ai.models.scenario.parameters import *
 
@@ -30,12 +31,14 @@ class PodScenario(Scenario):
             self.exp_recovery_time,
         ]
 
+    @classmethod
+    def search_space_size(cls, cluster_components: ClusterComponents) -> float:
+        # Namespace and one of its pod labels, other parameters are fixed
+        return sum(len(labels) for labels in cluster_components.index.namespace_pod_labels.values())
+
     def mutate(self):
-        namespace = rng.choice([
-            namespace for namespace in self._cluster_components.namespaces 
-            if len(namespace.pods) > 0
-        ])
-        pod = rng.choice(namespace.pods)
+        namespace = self._cluster_components.index.random_namespace()
+        pod = rng.pick(namespace.pods)
         labels = pod.labels
         label = rng.choice(list(labels.keys()))
 
@@ -1,4 +1,5 @@
 from krkn_ai.utils.rng import rng
+from krkn_ai.models.cluster_components import ClusterComponents
 from krkn_ai.models.scenario.base import Scenario
 from krkn_ai.models.scenario.parameters import *
 
@@ -28,28 +29,25 @@ class TimeScenario(Scenario):
             self.namespace,
         ]
 
+    @classmethod
+    def search_space_size(cls, cluster_components: ClusterComponents) -> float:
+        # Pod label of a namespace or a node label, with 2 actions
+        index = cluster_components.index
+        pod_labels = sum(len(labels) for labels in index.namespace_pod_labels.values())
+        return 2 * (pod_labels + len(index.node_labels))
+
     def mutate(self):
         self.object_type.mutate()
         self.action_time.mutate()
         
+        index = self._cluster_components.index
         if self.object_type.value == "pod":
-            namespace = rng.choice([
-                namespace for namespace in self._cluster_components.namespaces 
-                if len(namespace.pods) > 0
-            ])
-            all_labels = set()
+            namespace = index.random_namespace()
             # select a random pod label
-            for p in namespace.pods:
-                for label, value in p.labels.items():
-                    all_labels.add(f"{label}={value}")
-            self.label_selector.value = rng.choice(list(all_labels))
+            self.label_selector.value = rng.pick(index.namespace_pod_labels[namespace.name])
             self.namespace.value = namespace.name
         else:
-            all_labels = set()
             # select a random node label
-            for n in self._cluster_components.nodes:
-                for label, value in n.labels.items():
-                    all_labels.add(f"{label}={value}")
-            self.label_selector.value = rng.choice(list(all_labels))
+            self.label_selector.value = rng.pick(index.node_labels)
             self.namespace.value = ""
 
@@ -1,6 +1,6 @@
 import json
 import os
-from typing import List
+from typing import List, Tuple
 
 import yaml
 import pandas as pd
@@ -9,7 +9,9 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 from matplotlib.ticker import MaxNLocator
 
+from krkn_ai.algorithm.pareto import objective_vector
 from krkn_ai.models.app import CommandRunResult
+from krkn_ai.models.config import ConfigFile
 from krkn_ai.utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -65,3 +67,33 @@ class GenerationsReporter:
             elif self.format == 'yaml':
                 yaml.dump(results, f, sort_keys=False)
             logger.debug("Best generation report saved to %s", save_path)
+
+    def save_pareto_front(
+        self,
+        front: List[CommandRunResult],
+        objectives: List[Tuple[str, str]],
+        config: ConfigFile
+    ):
+        output_dir = os.path.join(self.output_dir, "reports")
+        os.makedirs(output_dir, exist_ok=True)
+        save_path = os.path.join(output_dir, "pareto_front.%s" % self.format)
+        names = [name for name, _ in objectives]
+        report = {
+            "objectives": [{"name": name, "description": description} for name, description in objectives],
+            "scenarios": [
+                {
+                    "scenario_id": result.scenario_id,
+                    "generation_id": result.generation_id,
+                    "scenario": str(result.scenario),
+                    "fitness_score": result.fitness_result.fitness_score,
+                    "objectives": dict(zip(names, objective_vector(result, config))),
+                }
+                for result in sorted(front, key=lambda x: x.fitness_result.fitness_score, reverse=True)
+            ],
+        }
+        with open(save_path, "w", encoding="utf-8") as f:
+            if self.format == 'json':
+                json.dump(report, f, indent=4)
+            elif self.format == 'yaml':
+                yaml.dump(report, f, sort_keys=False)
+        logger.info("Pareto front of %d scenarios saved to %s", len(front), save_path)
@@ -1,5 +1,6 @@
 import os
 from datetime import datetime
+import numpy as np
 import pandas as pd
 
 import seaborn as sns
@@ -32,11 +33,12 @@ class HealthCheckReporter:
             for component_results in health_check_results:
                 if len(component_results) == 0:
                     break
-                component_name = component_results[0].name
-                min_response_time = min([result.response_time for result in component_results])
-                max_response_time = max([result.response_time for result in component_results])
-                average_response_time = sum([result.response_time for result in component_results]) / len(component_results)
-                success_count = sum([result.success for result in component_results])
+                component_name = component_results.name
+                response_times = component_results.response_time_array()
+                min_response_time = float(response_times.min())
+                max_response_time = float(response_times.max())
+                average_response_time = float(response_times.mean())
+                success_count = int(np.count_nonzero(component_results.success_array()))
                 failure_count = len(component_results) - success_count
 
                 results.append({
@@ -65,17 +67,17 @@ class HealthCheckReporter:
         os.makedirs(output_dir, exist_ok=True)
         save_path = os.path.join(output_dir, "scenario_%d.png" % result.scenario_id)
 
-        # Flatten the data
-        records = []
-        for _, health_check_results in result.health_check_results.items():
-            for health_check_result in health_check_results:
-                records.append({
-                    "application": health_check_result.name,
-                    "timestamp": pd.to_datetime(health_check_result.timestamp),
-                    "response_time": health_check_result.response_time,
-                    "success": 1 if health_check_result.success else 0,
-                })
-        df = pd.DataFrame(records)
+        # Build a single frame from the columnar health check samples
+        local_tz = datetime.now().astimezone().tzinfo
+        frames = []
+        for _, series in result.health_check_results.items():
+            frames.append(pd.DataFrame({
+                "application": series.name,
+                "timestamp": pd.to_datetime(series.sent_array(), unit="s", utc=True).tz_convert(local_tz).tz_localize(None),
+                "response_time": series.response_time_array(),
+                "success": series.success_array().astype(int),
+            }))
+        df = pd.concat(frames, ignore_index=True)
         df = df.sort_values("timestamp")
         
         # Create formatted timestamp strings for display
@@ -149,6 +151,7 @@ class HealthCheckReporter:
             "health_check_response_time_score": fitness_result.fitness_result.health_check_response_time_score,
             "krkn_failure_score": fitness_result.fitness_result.krkn_failure_score,
             "fitness_score": fitness_result.fitness_result.fitness_score,
+            "truncated": fitness_result.truncated,
         }])
 
         df.to_csv(report_path, mode='a', header=not file_exists, index=False)
@@ -1,33 +1,181 @@
+import os
+import gzip
+import contextlib
+import json
+import hashlib
 import shlex
+import signal
 import subprocess
-from typing import Iterator
+import threading
+from collections import deque
+from typing import Iterator, List, Optional, Set, Tuple, Union
 
+from krkn_ai.constants import LOG_TAIL_LINES, STOP_GRACE_PERIOD
 from krkn_ai.utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Commands running in their own session, Ctrl+C doesn't reach them
+_sessions: Set[subprocess.Popen] = set()
+_sessions_lock = threading.Lock()
 
-def id_generator() -> Iterator[int]:
-    i = 1
-    while True:
-        yield i
-        i += 1
 
+def sha256_digest(data) -> str:
+    '''
+    SHA-256 hex digest of JSON serializable data, with keys sorted so it is stable across processes.
+    '''
+    payload = json.dumps(data, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class IdGenerator:
+    '''
+    Thread-safe auto-increment ID generator whose state can be saved and restored.
+    '''
+    def __init__(self, start: int = 1):
+        self._next = start
+        self._lock = threading.Lock()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> int:
+        with self._lock:
+            value = self._next
+            self._next += 1
+            return value
 
-def run_shell(command, do_not_log=False):
+    def get_state(self) -> int:
+        return self._next
+
+    def set_state(self, state: int):
+        with self._lock:
+            self._next = state
+
+
+def id_generator(start: int = 1) -> Iterator[int]:
+    return IdGenerator(start)
+
+
+def run_shell(command: Union[str, List[str]], do_not_log=False):
     '''
     Run shell command and get logs and statuscode in output.
+    Command can be a string, which is split as in a shell, or an argv list which is run as is.
     '''
-    logger.debug("Running command: %s", command)
-    logs = ""
-    command = shlex.split(command)
+    if isinstance(command, str):
+        command = shlex.split(command)
+    logger.debug("Running command: %s", shlex.join(command))
+    logs = []
     process = subprocess.Popen(
         command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
     )
     for line in process.stdout:
         if not do_not_log:
             logger.debug("%s", line.rstrip())
-        logs += line
+        logs.append(line)
     process.wait()
     logger.debug("Run Status: %d", process.returncode)
-    return logs, process.returncode
+    return "".join(logs), process.returncode
+
+
+def run_shell_to_file(
+    command: Union[str, List[str]],
+    log_path: str,
+    compress: bool = False,
+    tail_lines: int = LOG_TAIL_LINES,
+    stop: Optional[threading.Event] = None,
+) -> Tuple[str, int]:
+    '''
+    Run shell command and stream its output to a log file (gzip compressed if requested).
+    Only the last tail_lines lines are kept in memory, they are returned along with the statuscode.
+
+    Setting the stop event interrupts the command (and its child processes) as with Ctrl+C,
+    it is killed if it doesn't exit within STOP_GRACE_PERIOD seconds. The command then runs
+    in its own session, so it is interrupted the same way when the caller is interrupted.
+    '''
+    if isinstance(command, str):
+        command = shlex.split(command)
+    logger.debug("Running command: %s", shlex.join(command))
+    os.makedirs(os.path.dirname(os.path.abspath(log_path)), exist_ok=True)
+    tail = deque(maxlen=tail_lines)
+    opener = gzip.open if compress else open
+    with opener(log_path, "wt", encoding="utf-8") as log_file:
+        # Own process group, so that an interrupt also reaches the processes started by the command
+        process = subprocess.Popen(
+            command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True,
+            start_new_session=stop is not None
+        )
+        if stop is not None:
+            with _sessions_lock:
+                _sessions.add(process)
+            threading.Thread(target=_interrupt_on_stop, args=(process, stop), daemon=True).start()
+        try:
+            for line in process.stdout:
+                log_file.write(line)
+                tail.append(line)
+            process.wait()
+        except BaseException:
+            # Don't leave the command running on e.g. KeyboardInterrupt
+            if stop is not None:
+                _interrupt(process)
+            raise
+        finally:
+            with _sessions_lock:
+                _sessions.discard(process)
+    logger.debug("Run Status: %d", process.returncode)
+    return "".join(tail), process.returncode
+
+
+def interrupt_running_commands():
+    '''
+    Interrupt all commands started by run_shell_to_file in their own session and wait for them to exit.
+    Used when the run is aborted while commands are running in worker threads.
+    '''
+    with _sessions_lock:
+        processes = list(_sessions)
+    threads = [threading.Thread(target=_interrupt, args=(process,)) for process in processes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+@contextlib.contextmanager
+def interrupt_commands_on_error():
+    '''
+    Interrupt commands running in their own session when the block raises (e.g. KeyboardInterrupt),
+    must be entered after a thread pool running them so that workers are not waited for first.
+    '''
+    try:
+        yield
+    except BaseException:
+        interrupt_running_commands()
+        raise
+
+
+def _interrupt_on_stop(process: subprocess.Popen, stop: threading.Event):
+    while not stop.wait(1):
+        if process.poll() is not None:
+            return
+    _interrupt(process)
+
+
+def _interrupt(process: subprocess.Popen):
+    '''Send SIGINT to the process group of the command, SIGKILL after STOP_GRACE_PERIOD seconds.'''
+    if process.poll() is not None:
+        return
+    logger.debug("Interrupting command with pid %d", process.pid)
+    try:
+        os.killpg(process.pid, signal.SIGINT)
+    except ProcessLookupError:
+        # Process exited in the meantime
+        return
+    try:
+        process.wait(timeout=STOP_GRACE_PERIOD)
+    except subprocess.TimeoutExpired:
+        logger.warning("Command with pid %d did not exit after interrupt, killing it", process.pid)
+    try:
+        # Child processes left behind would keep the output open
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
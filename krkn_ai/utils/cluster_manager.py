@@ -1,9 +1,12 @@
 from os import name
 import re
 import ssl
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
 from krkn_lib.k8s.krkn_kubernetes import KrknKubernetes
-from kubernetes.client.models import V1PodSpec
+from kubernetes.client.exceptions import ApiException
+from kubernetes.client.models import V1Node, V1Pod, V1PodList, V1PodSpec
+from krkn_ai.constants import DISCOVERY_MAX_RESTARTS, DISCOVERY_MAX_WORKERS, DISCOVERY_PAGE_SIZE, HTTP_STATUS_GONE
 from krkn_ai.utils import run_shell
 from krkn_ai.utils.logger import get_logger
 from krkn_ai.models.cluster_components import ClusterComponents, Container, Namespace, Node, Pod
@@ -11,8 +14,9 @@ from krkn_ai.models.cluster_components import ClusterComponents, Container, Name
 logger = get_logger(__name__)
 
 class ClusterManager:
-    def __init__(self, kubeconfig: str):
+    def __init__(self, kubeconfig: str, max_workers: int = DISCOVERY_MAX_WORKERS):
         self.kubeconfig = kubeconfig
+        self.max_workers = max_workers  # Concurrent node interface probes
         self.krkn_k8s = KrknKubernetes(kubeconfig_path=kubeconfig)
         self.apps_api = self.krkn_k8s.apps_api
         self.api_client = self.krkn_k8s.api_client
@@ -27,9 +31,10 @@ class ClusterManager:
     ) -> ClusterComponents:
         namespaces = self.list_namespaces(namespace_pattern)
 
-        for i, namespace in enumerate(namespaces):
-            pods = self.list_pods(namespace, pod_label_pattern)
-            namespaces[i].pods = pods
+        # Single cluster-wide (paged) pod list instead of one request per namespace
+        pods = self.list_all_pods({ns.name for ns in namespaces}, pod_label_pattern)
+        for namespace in namespaces:
+            namespace.pods = pods.get(namespace.name, [])
 
         return ClusterComponents(
             namespaces=namespaces,
@@ -40,44 +45,99 @@ class ClusterManager:
     def list_namespaces(self, namespace_pattern: str = None) -> List[Namespace]:
         logger.debug("Namespace pattern: %s", namespace_pattern)
 
-        namespace_patterns = self.__process_pattern(namespace_pattern)
+        namespace_patterns = self.compile_pattern(namespace_pattern)
 
         namespaces = self.krkn_k8s.list_namespaces()
 
         filtered_namespaces = set()
 
         for ns in namespaces:
-            for pattern in namespace_patterns:
-                if re.match(pattern, ns):
-                    filtered_namespaces.add(ns)
+            if any(pattern.match(ns) for pattern in namespace_patterns):
+                filtered_namespaces.add(ns)
 
         logger.debug("Filtered namespaces: %d", len(filtered_namespaces))
         return [Namespace(name=ns) for ns in filtered_namespaces]
 
-    def list_pods(self, namespace: Namespace, pod_labels_patterns: List[str]) -> List[str]:
-        pod_labels_patterns = self.__process_pattern(pod_labels_patterns)
+    def list_all_pods(self, namespaces: Set[str], pod_labels_patterns: str) -> Dict[str, List[Pod]]:
+        '''
+        List pods across all namespaces using paged requests and group them by namespace.
+        Pods outside of the given namespaces are skipped.
+        '''
+        pod_labels_patterns = self.compile_pattern(pod_labels_patterns)
+
+        pods: Dict[str, List[Pod]] = {}
+        total = 0
+
+        def restart():
+            nonlocal total
+            pods.clear()
+            total = 0
+
+        for page in self.list_pod_pages(on_restart=restart):
+            for pod in page.items:
+                total += 1
+                if pod.metadata.namespace not in namespaces:
+                    continue
+                pods.setdefault(pod.metadata.namespace, []).append(self.to_pod_component(pod, pod_labels_patterns))
+
+        logger.debug(
+            "Filtered %d pods out of %d in %d namespaces",
+            sum(len(x) for x in pods.values()), total, len(pods)
+        )
+        return pods
 
-        pods = self.core_api.list_namespaced_pod(namespace=namespace.name).items
-        pod_list = []
+    def list_pods(self, namespace: Namespace, pod_labels_patterns: str) -> List[Pod]:
+        pod_labels_patterns = self.compile_pattern(pod_labels_patterns)
 
-        for pod in pods:
-            pod_component = Pod(
-                name=pod.metadata.name,
-            )
-            # Filter label keys by patterns
-            labels = {}
-            for pattern in pod_labels_patterns:
-                if pod.metadata.labels is not None:
-                    for label in pod.metadata.labels:
-                        if re.match(pattern, label):
-                            labels[label] = pod.metadata.labels[label]
-            pod_component.labels = labels
-            pod_component.containers = self.list_containers(pod.spec)
-            pod_list.append(pod_component)
+        pods = self.core_api.list_namespaced_pod(namespace=namespace.name).items
+        pod_list = [self.to_pod_component(pod, pod_labels_patterns) for pod in pods]
 
         logger.debug("Filtered %d pods in namespace %s", len(pod_list), namespace.name)
         return pod_list
 
+    def list_pod_pages(self, on_restart: Optional[Callable[[], None]] = None) -> Iterator[V1PodList]:
+        '''
+        List pods across all namespaces, one page at a time.
+
+        On large clusters the continue token can expire before the last page (410 Gone),
+        the listing then starts over so that all pages come from one consistent snapshot.
+        on_restart is called beforehand, pages yielded so far have to be discarded.
+        '''
+        _continue = None
+        restarts = 0
+        while True:
+            try:
+                response = self.core_api.list_pod_for_all_namespaces(
+                    limit=DISCOVERY_PAGE_SIZE,
+                    _continue=_continue
+                )
+            except ApiException as e:
+                if e.status != HTTP_STATUS_GONE or _continue is None or restarts >= DISCOVERY_MAX_RESTARTS:
+                    raise
+                restarts += 1
+                logger.warning("Pod list expired before its last page, listing pods again (%d/%d)", restarts, DISCOVERY_MAX_RESTARTS)
+                if on_restart is not None:
+                    on_restart()
+                _continue = None
+                continue
+            yield response
+            _continue = response.metadata._continue
+            if not _continue:
+                break
+
+    def to_pod_component(self, pod: V1Pod, pod_labels_patterns: List[re.Pattern]) -> Pod:
+        # Filter label keys by patterns
+        labels = {}
+        if pod.metadata.labels is not None:
+            for label, value in pod.metadata.labels.items():
+                if any(pattern.match(label) for pattern in pod_labels_patterns):
+                    labels[label] = value
+        return Pod(
+            name=pod.metadata.name,
+            labels=labels,
+            containers=self.list_containers(pod.spec),
+        )
+
     def list_containers(self, pod_spec: V1PodSpec) -> List[Container]:
         containers = []
         for container in pod_spec.containers:
@@ -89,33 +149,28 @@ class ClusterManager:
         return containers
 
     def list_nodes(self, node_label_pattern: str = None) -> List[Node]:
-        node_label_pattern = list(set(self.__process_pattern(node_label_pattern) + ["kubernetes.io/hostname"]))
+        node_label_pattern = self.compile_node_label_pattern(node_label_pattern)
 
         nodes = self.core_api.list_node().items
 
+        # Node metrics and interfaces are fetched once for all the nodes
+        try:
+            node_metrics = self.fetch_node_metrics()
+        except Exception as e:
+            node_metrics = {}
+            logger.error("Failed to fetch node metrics: %s", e)
+        node_interfaces = self.list_nodes_interfaces([node.metadata.name for node in nodes])
+
         node_list = []
 
         for node in nodes:
-            labels = {}
-            for pattern in node_label_pattern:
-                if node.metadata.labels is not None:
-                    for label in node.metadata.labels:
-                        if re.match(pattern, label):
-                            labels[label] = node.metadata.labels[label]
-            node_component = Node(
-                name=node.metadata.name,
-                labels=labels
-            )
+            node_component = self.to_node_component(node, node_label_pattern)
+            node_component.interfaces = node_interfaces.get(node.metadata.name, [])
 
-            try:
-                node_component.interfaces = self.list_node_interfaces(node.metadata.name)
-            except Exception as e:
-                logger.error("Failed to list node interfaces for node %s: %s", node.metadata.name, e)
-            
             try:
                 alloc_cpu = self.parse_cpu(node.status.allocatable["cpu"])
                 alloc_mem = self.parse_memory(node.status.allocatable["memory"])
-                usage_cpu, usage_mem = self.__fetch_node_metrics(node.metadata.name)
+                usage_cpu, usage_mem = node_metrics[node.metadata.name]
                 node_component.free_cpu = alloc_cpu - usage_cpu
                 node_component.free_mem = alloc_mem - usage_mem
             except Exception as e:
@@ -127,6 +182,33 @@ class ClusterManager:
         logger.debug("Filtered %d nodes", len(node_list))
         return node_list
 
+    def to_node_component(self, node: V1Node, node_label_patterns: List[re.Pattern]) -> Node:
+        labels = {}
+        if node.metadata.labels is not None:
+            for label, value in node.metadata.labels.items():
+                if any(pattern.match(label) for pattern in node_label_patterns):
+                    labels[label] = value
+        return Node(
+            name=node.metadata.name,
+            labels=labels,
+        )
+
+    def list_nodes_interfaces(self, nodes: List[str]) -> Dict[str, List[str]]:
+        '''
+        Probe node interfaces with a bounded pool of concurrent debug pods.
+        '''
+        def probe(node: str) -> List[str]:
+            try:
+                return self.list_node_interfaces(node)
+            except Exception as e:
+                logger.error("Failed to list node interfaces for node %s: %s", node, e)
+                return []
+
+        if len(nodes) == 0:
+            return {}
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(nodes)))) as executor:
+            return dict(zip(nodes, executor.map(probe, nodes)))
+
     def list_node_interfaces(self, node: str) -> List[str]:
         # List all the interfaces on the node
         logger.debug("Listing node interfaces for node %s", node)
@@ -159,19 +241,30 @@ class ClusterManager:
         
         return patterns
 
-    def __fetch_node_metrics(self, node: str):
+    def compile_pattern(self, pattern_string: str) -> List[re.Pattern]:
+        return [re.compile(pattern) for pattern in self.__process_pattern(pattern_string)]
+
+    def compile_node_label_pattern(self, pattern_string: str) -> List[re.Pattern]:
+        # Hostname label is always kept, it is used to target nodes in scenarios
+        return self.compile_pattern(pattern_string) + [re.compile("kubernetes.io/hostname")]
+
+    def fetch_node_metrics(self) -> Dict[str, Tuple[float, int]]:
+        '''
+        Fetch cpu (millicores) and memory (bytes) usage of all the nodes in a single request.
+        '''
         metrics = self.custom_obj_api.list_cluster_custom_object(
             group="metrics.k8s.io",
             version="v1beta1",
             plural="nodes"
         )
 
+        node_metrics = {}
         for item in metrics["items"]:
             name = item["metadata"]["name"]
-            if name == node:
-                usage_cpu = item["usage"]["cpu"]       # e.g. "250m"
-                usage_mem = item["usage"]["memory"]    # e.g. "1024Mi"
-                return self.parse_cpu(usage_cpu), self.parse_memory(usage_mem)
+            usage_cpu = item["usage"]["cpu"]       # e.g. "250m"
+            usage_mem = item["usage"]["memory"]    # e.g. "1024Mi"
+            node_metrics[name] = (self.parse_cpu(usage_cpu), self.parse_memory(usage_mem))
+        return node_metrics
 
     @staticmethod
     def parse_cpu(cpu_str: str):
@@ -0,0 +1,247 @@
+'''
+Incremental cluster discovery built on top of ClusterManager.
+
+Working Details:
+1. Namespaces, pods and nodes are listed once and stored in a local snapshot along with
+   the resourceVersion of each object and of the list.
+2. A background thread per resource watches for changes from the last seen resourceVersion
+   and applies only the deltas (ADDED, MODIFIED, DELETED) to the snapshot.
+3. When the resourceVersion is too old (410 Gone), the resource is listed again.
+4. snapshot() returns ClusterComponents built from the local state, it is only rebuilt
+   when the state has changed since the previous call.
+'''
+
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from kubernetes import watch
+from kubernetes.client.exceptions import ApiException
+
+from krkn_ai.constants import CLUSTER_WATCH_RETRY_DELAY, CLUSTER_WATCH_TIMEOUT, HTTP_STATUS_GONE
+from krkn_ai.models.cluster_components import ClusterComponents, Namespace, Node, Pod
+from krkn_ai.models.config import ClusterWatchConfig
+from krkn_ai.utils.cluster_manager import ClusterManager
+from krkn_ai.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class ClusterWatcher:
+    def __init__(self, cluster_manager: ClusterManager, config: ClusterWatchConfig, seed: ClusterComponents):
+        self.cluster_manager = cluster_manager
+        self.core_api = cluster_manager.core_api
+
+        # Namespaces in scope, defaults to the namespaces of the discovered components
+        self._namespace_patterns: Optional[List[re.Pattern]] = None
+        if config.namespace is not None:
+            self._namespace_patterns = cluster_manager.compile_pattern(config.namespace)
+        self._seed_namespaces = {ns.name for ns in seed.namespaces}
+        self._pod_label_patterns = cluster_manager.compile_pattern(config.pod_label)
+        self._node_label_patterns = cluster_manager.compile_node_label_pattern(config.node_label)
+
+        # Interfaces and resources of already discovered nodes are reused instead of probing again
+        self._seed_nodes: Dict[str, Node] = {node.name: node for node in seed.nodes}
+
+        # Local snapshot: object key -> (resourceVersion, component)
+        self._namespaces: Dict[str, str] = {}
+        self._pods: Dict[Tuple[str, str], Tuple[str, Pod]] = {}
+        self._nodes: Dict[str, Tuple[str, Node]] = {}
+        self._resource_versions: Dict[str, Optional[str]] = {}
+
+        self._lock = threading.Lock()
+        self._version = 0   # Incremented whenever the snapshot changes
+        self._snapshot: Optional[ClusterComponents] = None
+        self._snapshot_version = -1
+
+        self._stop_event = threading.Event()
+        self._watches: Dict[str, watch.Watch] = {}
+        self._threads: List[threading.Thread] = []
+
+        self._resources: Dict[str, Tuple[Callable, Callable, Callable]] = {
+            "namespaces": (self.core_api.list_namespace, self.__list_namespaces, self.__apply_namespace),
+            "pods": (self.core_api.list_pod_for_all_namespaces, self.__list_pods, self.__apply_pod),
+            "nodes": (self.core_api.list_node, self.__list_nodes, self.__apply_node),
+        }
+
+    def start(self):
+        '''List all resources and start watching for changes.'''
+        for _, relist, _ in self._resources.values():
+            relist()
+        for kind in self._resources:
+            thread = threading.Thread(target=self.__watch_loop, args=(kind,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(
+            "Cluster watcher started with %d namespaces, %d pods and %d nodes",
+            len(self._namespaces), len(self._pods), len(self._nodes)
+        )
+
+    def stop(self):
+        self._stop_event.set()
+        for w in list(self._watches.values()):
+            w.stop()
+        logger.debug("Cluster watcher stopped")
+
+    def snapshot(self) -> ClusterComponents:
+        '''
+        Current cluster components. The same object is returned as long as nothing changed.
+        '''
+        with self._lock:
+            if self._snapshot is not None and self._snapshot_version == self._version:
+                return self._snapshot
+
+            pods: Dict[str, List[Pod]] = {}
+            for (namespace, _), (_, pod) in sorted(self._pods.items()):
+                pods.setdefault(namespace, []).append(pod)
+            self._snapshot = ClusterComponents(
+                namespaces=[
+                    Namespace(name=name, pods=pods.get(name, []))
+                    for name in sorted(self._namespaces)
+                ],
+                nodes=[node for _, (_, node) in sorted(self._nodes.items())],
+            )
+            self._snapshot_version = self._version
+            return self._snapshot
+
+    def __watch_loop(self, kind: str):
+        list_func, relist, apply = self._resources[kind]
+        while not self._stop_event.is_set():
+            try:
+                if self._resource_versions.get(kind) is None:
+                    relist()
+                w = watch.Watch()
+                self._watches[kind] = w
+                for event in w.stream(
+                    list_func,
+                    resource_version=self._resource_versions[kind],
+                    timeout_seconds=CLUSTER_WATCH_TIMEOUT,
+                    allow_watch_bookmarks=True,
+                ):
+                    if self._stop_event.is_set():
+                        w.stop()
+                        break
+                    obj = event["object"]
+                    if event["type"] != "BOOKMARK":
+                        apply(event["type"], obj)
+                    self._resource_versions[kind] = obj.metadata.resource_version
+            except ApiException as e:
+                if e.status == HTTP_STATUS_GONE:
+                    logger.debug("Watch on %s expired, listing again", kind)
+                    self._resource_versions[kind] = None
+                else:
+                    logger.warning("Watch on %s failed: %s", kind, e)
+                    self._stop_event.wait(CLUSTER_WATCH_RETRY_DELAY)
+            except Exception as e:
+                if self._stop_event.is_set():
+                    break
+                logger.warning("Watch on %s failed: %s", kind, e)
+                self._stop_event.wait(CLUSTER_WATCH_RETRY_DELAY)
+
+    def __in_scope(self, namespace: str) -> bool:
+        if self._namespace_patterns is None:
+            return namespace in self._seed_namespaces
+        return any(pattern.match(namespace) for pattern in self._namespace_patterns)
+
+    # Full list of a resource, used on start and when the watch expired
+    def __list_namespaces(self):
+        response = self.core_api.list_namespace()
+        namespaces = {
+            ns.metadata.name: ns.metadata.resource_version
+            for ns in response.items
+            if self.__in_scope(ns.metadata.name)
+        }
+        with self._lock:
+            self._namespaces = namespaces
+            self._version += 1
+        self._resource_versions["namespaces"] = response.metadata.resource_version
+
+    def __list_pods(self):
+        pods = {}
+        resource_version = None
+        for page in self.cluster_manager.list_pod_pages(on_restart=pods.clear):
+            resource_version = page.metadata.resource_version
+            for pod in page.items:
+                if self.__in_scope(pod.metadata.namespace):
+                    pods[(pod.metadata.namespace, pod.metadata.name)] = (
+                        pod.metadata.resource_version,
+                        self.cluster_manager.to_pod_component(pod, self._pod_label_patterns)
+                    )
+        with self._lock:
+            self._pods = pods
+            self._version += 1
+        self._resource_versions["pods"] = resource_version
+
+    def __list_nodes(self):
+        response = self.core_api.list_node()
+        nodes = {}
+        for node in response.items:
+            nodes[node.metadata.name] = (node.metadata.resource_version, self.__to_node(node, self._nodes))
+        with self._lock:
+            self._nodes = nodes
+            self._version += 1
+        self._resource_versions["nodes"] = response.metadata.resource_version
+
+    # Watch event handlers. Each resource is only modified by its own watch thread,
+    # the lock is held just for the updates so that snapshot() sees a consistent state.
+    def __apply_namespace(self, event_type: str, ns):
+        name = ns.metadata.name
+        if event_type == "DELETED":
+            self.__delete(self._namespaces, name)
+        elif self.__in_scope(name) and name not in self._namespaces:
+            self.__update(self._namespaces, name, ns.metadata.resource_version)
+
+    def __apply_pod(self, event_type: str, pod):
+        key = (pod.metadata.namespace, pod.metadata.name)
+        if event_type == "DELETED":
+            self.__delete(self._pods, key)
+            return
+        if not self.__in_scope(pod.metadata.namespace):
+            return
+        current = self._pods.get(key)
+        if current is not None and current[0] == pod.metadata.resource_version:
+            return
+        component = self.cluster_manager.to_pod_component(pod, self._pod_label_patterns)
+        # Most pod updates are status changes which are not part of the components
+        if current is None or current[1] != component:
+            self.__update(self._pods, key, (pod.metadata.resource_version, component))
+
+    def __apply_node(self, event_type: str, node):
+        name = node.metadata.name
+        if event_type == "DELETED":
+            self.__delete(self._nodes, name)
+            return
+        current = self._nodes.get(name)
+        if current is not None and current[0] == node.metadata.resource_version:
+            return
+        component = self.__to_node(node, self._nodes)
+        if current is None or current[1] != component:
+            self.__update(self._nodes, name, (node.metadata.resource_version, component))
+
+    def __update(self, store: Dict, key, value):
+        with self._lock:
+            store[key] = value
+            self._version += 1
+
+    def __delete(self, store: Dict, key):
+        with self._lock:
+            if store.pop(key, None) is not None:
+                self._version += 1
+
+    def __to_node(self, node, known: Dict[str, Tuple[str, Node]]) -> Node:
+        component = self.cluster_manager.to_node_component(node, self._node_label_patterns)
+        name = node.metadata.name
+        previous = known[name][1] if name in known else self._seed_nodes.get(name)
+        if previous is not None:
+            component.interfaces = previous.interfaces
+            component.free_cpu = previous.free_cpu
+            component.free_mem = previous.free_mem
+        else:
+            # New node, resources are not known until next discovery
+            component.free_cpu = -1
+            component.free_mem = -1
+            try:
+                component.interfaces = self.cluster_manager.list_node_interfaces(name)
+            except Exception as e:
+                logger.error("Failed to list node interfaces for node %s: %s", name, e)
+        return component
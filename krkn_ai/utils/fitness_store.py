@@ -0,0 +1,131 @@
+'''
+Persistent fitness store backed by SQLite.
+
+Scenario results are keyed by a canonical hash of the scenario and a fingerprint of the
+cluster/fitness definition they were measured against, so that a new Krkn-AI run can
+reuse results of chaos runs that were already executed in a previous campaign.
+'''
+
+import os
+import json
+import time
+import sqlite3
+from typing import Optional
+
+from krkn_ai.models.app import CommandRunResult, KrknRunnerType
+from krkn_ai.models.cluster_components import ClusterComponents
+from krkn_ai.models.config import ConfigFile
+from krkn_ai.models.scenario.base import BaseScenario
+from krkn_ai.utils import sha256_digest
+from krkn_ai.utils.fs import env_is_truthy
+from krkn_ai.utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def scenario_key(scenario: BaseScenario) -> str:
+    '''Canonical hash of a scenario which is stable across processes.'''
+    return scenario.fingerprint
+
+
+def _components_fingerprint(components: ClusterComponents):
+    '''
+    Canonical view of cluster components which ignores pod instance names, so that
+    pods recreated with a new ReplicaSet suffix do not invalidate stored results.
+    '''
+    namespaces = {}
+    for ns in components.namespaces:
+        pods = {
+            sha256_digest({
+                "labels": pod.labels,
+                "containers": sorted(container.name for container in pod.containers),
+            })
+            for pod in ns.pods
+        }
+        namespaces[ns.name] = sorted(pods)
+    return {
+        "namespaces": namespaces,
+        "nodes": [node.model_dump(mode='json') for node in components.nodes],
+    }
+
+
+def cluster_fingerprint(config: ConfigFile, runner_type: KrknRunnerType) -> str:
+    '''
+    Fingerprint of the cluster components, the fitness definition and the runner backend.
+    Results are only reused when all of them match, so simulated or mocked results are
+    never served to runs against a real cluster.
+    '''
+    return sha256_digest({
+        "runner_type": runner_type.value if runner_type is not None else None,
+        "mock_run": env_is_truthy("MOCK_RUN"),
+        "mock_fitness": env_is_truthy("MOCK_FITNESS"),
+        "cluster_components": _components_fingerprint(config.cluster_components),
+        "fitness_function": config.fitness_function.model_dump(mode='json', exclude={'items': {'__all__': {'id'}}}),
+        "health_checks": config.health_checks.model_dump(mode='json'),
+    })
+
+
+class FitnessStore:
+    def __init__(self, path: str, fingerprint: str, ttl: int = 0):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.ttl = ttl  # in seconds, 0 means results never expire
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS fitness ("
+            "scenario_hash TEXT NOT NULL, "
+            "cluster_fingerprint TEXT NOT NULL, "
+            "created_at REAL NOT NULL, "
+            "result TEXT NOT NULL, "
+            "PRIMARY KEY (scenario_hash, cluster_fingerprint))"
+        )
+        self.conn.commit()
+        logger.debug("Fitness store initialized at %s", path)
+
+    def get(self, scenario: BaseScenario, generation_id: int) -> Optional[CommandRunResult]:
+        '''Fetch a previously measured result for the scenario, if still valid.'''
+        key = scenario_key(scenario)
+        row = self.conn.execute(
+            "SELECT created_at, result FROM fitness WHERE scenario_hash = ? AND cluster_fingerprint = ?",
+            (key, self.fingerprint)
+        ).fetchone()
+        if row is None:
+            return None
+
+        created_at, result = row
+        if self.ttl > 0 and time.time() - created_at > self.ttl:
+            logger.debug("Fitness store entry for %s expired", scenario)
+            self.conn.execute(
+                "DELETE FROM fitness WHERE scenario_hash = ? AND cluster_fingerprint = ?",
+                (key, self.fingerprint)
+            )
+            self.conn.commit()
+            return None
+
+        try:
+            data = json.loads(result)
+            return CommandRunResult(
+                **data,
+                scenario=scenario,
+                generation_id=generation_id,
+            )
+        except Exception as error:
+            logger.warning("Unable to load result from fitness store: %s", error)
+            return None
+
+    def put(self, result: CommandRunResult):
+        '''Persist result of a scenario run.'''
+        data = result.model_dump(
+            mode='json',
+            exclude={'scenario', 'scenario_id', 'generation_id'}
+        )
+        self.conn.execute(
+            "INSERT OR REPLACE INTO fitness (scenario_hash, cluster_fingerprint, created_at, result) VALUES (?, ?, ?, ?)",
+            (scenario_key(result.scenario), self.fingerprint, time.time(), json.dumps(data))
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
@@ -1,6 +1,17 @@
 import os
 import json
+import math
+import time
+import datetime
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
 from krkn_lib.prometheus.krkn_prometheus import KrknPrometheus
+from krkn_ai.constants import PROMETHEUS_QUERY_TIMEOUT
 from krkn_ai.utils import run_shell
 from krkn_ai.utils.fs import env_is_truthy
 from krkn_ai.utils.logger import get_logger
@@ -19,9 +30,10 @@ def is_openshift(kubeconfig: str) -> bool:
     return returncode == 0
 
 
-def create_prometheus_client(kubeconfig: str) -> KrknPrometheus:
+@functools.lru_cache(maxsize=None)
+def get_prometheus_endpoint(kubeconfig: str) -> Tuple[str, str]:
     """
-    Create a Prometheus client for the given kubeconfig.
+    Get the Prometheus query endpoint and token for the given kubeconfig.
 
     It first checks if the PROMETHEUS_URL and PROMETHEUS_TOKEN environment variables are set.
     If not, it fetches the Prometheus query endpoint and token from the Kubernetes cluster.
@@ -30,7 +42,7 @@ def create_prometheus_client(kubeconfig: str) -> KrknPrometheus:
         kubeconfig: The path to the Kubernetes configuration file.
 
     Returns:
-        KrknPrometheus: A Prometheus client.
+        Tuple[str, str]: Prometheus URL and token.
     """
     # Fetch Prometheus query endpoint
     url = os.getenv("PROMETHEUS_URL", "")
@@ -55,10 +67,24 @@ def create_prometheus_client(kubeconfig: str) -> KrknPrometheus:
         )
 
     logger.debug("Prometheus URL: %s", url)
+    return url, token.strip()
+
+
+def create_prometheus_client(kubeconfig: str) -> KrknPrometheus:
+    """
+    Create a Prometheus client for the given kubeconfig.
+
+    Args:
+        kubeconfig: The path to the Kubernetes configuration file.
+
+    Returns:
+        KrknPrometheus: A Prometheus client.
+    """
+    url, token = get_prometheus_endpoint(kubeconfig)
 
     # Try connecting to Prometheus
     try:
-        client = KrknPrometheus(url, token.strip())
+        client = KrknPrometheus(url, token)
         if env_is_truthy("MOCK_FITNESS"):
             return client
         client.process_query("1")
@@ -67,3 +93,92 @@ def create_prometheus_client(kubeconfig: str) -> KrknPrometheus:
     except Exception as e:
         # logger.exception("Unable to connect to Prometheus: %s", e)
         raise PrometheusConnectionError("Unable to connect to Prometheus. Please check if Prometheus is running and accessible. Try setting the \"PROMETHEUS_URL\" and \"PROMETHEUS_TOKEN\" environment variables to connect to Prometheus instance.")
+
+
+def create_prometheus_batch_client(kubeconfig: str, max_workers: int = 10) -> "PrometheusBatchClient":
+    """
+    Create a Prometheus client for running many queries concurrently.
+    """
+    url, token = get_prometheus_endpoint(kubeconfig)
+    return PrometheusBatchClient(url, token, max_workers=max_workers)
+
+
+class PrometheusBatchClient:
+    """
+    Runs Prometheus range queries concurrently over a pooled keep-alive HTTP session.
+    Can be used as a context manager, otherwise close() has to be called once done.
+    """
+    def __init__(self, url: str, token: str, max_workers: int = 10, timeout: float = PROMETHEUS_QUERY_TIMEOUT):
+        self.url = url.rstrip("/")
+        self.max_workers = max_workers
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        if token:
+            self.session.headers.update({"Authorization": f"Bearer {token}"})
+        # Same as KrknPrometheus, certificates of in-cluster endpoints are not verified
+        self.session.verify = False
+        urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def query_range(
+        self,
+        query: str,
+        start_time: datetime.datetime,
+        end_time: datetime.datetime,
+        step: float
+    ) -> List[Dict]:
+        """Run a range query and return the result vector."""
+        resp = self.session.get(
+            f"{self.url}/api/v1/query_range",
+            params={
+                "query": query,
+                # Window is widened to whole seconds so that a step equal to the
+                # test duration always yields both the start and the end sample
+                "start": math.floor(start_time.timestamp()),
+                "end": math.ceil(end_time.timestamp()),
+                "step": max(step, 1),
+            },
+            timeout=self.timeout,
+        )
+        resp.raise_for_status()
+        data = resp.json()
+        if data.get("status") != "success":
+            raise Exception(f"Prometheus query failed: {data.get('error')}")
+        return data["data"]["result"]
+
+    def query_range_batch(
+        self,
+        queries: List[Tuple[str, datetime.datetime, datetime.datetime, float]]
+    ) -> List[Tuple[List[Dict], float]]:
+        """
+        Run range queries concurrently.
+
+        Args:
+            queries: List of (query, start_time, end_time, step) tuples.
+
+        Returns:
+            List of (result, latency in seconds) in the same order as queries.
+        """
+        def timed_query(item):
+            start = time.perf_counter()
+            result = self.query_range(*item)
+            return result, time.perf_counter() - start
+
+        futures = [self.executor.submit(timed_query, item) for item in queries]
+        return [future.result() for future in futures]
+
+    def close(self):
+        """Shut down the worker pool and the HTTP session."""
+        self.executor.shutdown(wait=True)
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
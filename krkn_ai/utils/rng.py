@@ -1,5 +1,5 @@
 import numpy as np
-from typing import List, Any
+from typing import List, Any, Sequence
 
 class RNG:
     def __init__(self):
@@ -11,6 +11,10 @@ class RNG:
     def choice(self, items: List[Any]):
         return self.rng.choice(items)
 
+    def pick(self, items: Sequence[Any]):
+        '''Random element of a sequence without converting it to a NumPy array.'''
+        return items[self.rng.integers(0, len(items))]
+
     def choices(self, items: List[Any], weights: List[float], k: int = 1):
         return list(self.rng.choice(items, p=weights, size=k))
 
@@ -22,4 +26,10 @@ class RNG:
     def uniform(self, low: float, high: float):
         return self.rng.uniform(low, high)
 
+    def get_state(self):
+        return self.rng.bit_generator.state
+
+    def set_state(self, state):
+        self.rng.bit_generator.state = state
+
 rng = RNG()
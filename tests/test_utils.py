@@ -0,0 +1,88 @@
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import krkn_ai.utils as utils
+from krkn_ai.utils import interrupt_commands_on_error, run_shell_to_file
+
+pytestmark = pytest.mark.skipif(not os.path.isdir("/proc"), reason="process groups are read from /proc")
+
+# Background child ignores SIGINT as in a non-interactive shell, so it is only gone after SIGKILL
+LONG_RUNNING = ["sh", "-c", "echo $$; sleep 60 & sleep 60; wait"]
+
+
+def group_alive(pgid: int) -> bool:
+    # SIGKILL is delivered asynchronously, give the processes a moment to exit
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        if not _group_has_processes(pgid):
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def _group_has_processes(pgid: int) -> bool:
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                stat = f.read()
+        except OSError:
+            continue
+        # Fields after the command name: state, ppid, pgrp, ...
+        fields = stat[stat.rindex(")") + 2:].split()
+        if int(fields[2]) == pgid and fields[0] != "Z":
+            return True
+    return False
+
+
+def running_pgid() -> int:
+    # Commands in their own session lead a process group with their own pid
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        with utils._sessions_lock:
+            if len(utils._sessions) > 0:
+                return next(iter(utils._sessions)).pid
+        time.sleep(0.05)
+    raise AssertionError("command did not start")
+
+
+@pytest.fixture(autouse=True)
+def short_grace_period(monkeypatch):
+    monkeypatch.setattr(utils, "STOP_GRACE_PERIOD", 1)
+
+
+def test_keyboard_interrupt_stops_command_group(tmp_path):
+    log_path = str(tmp_path / "scenario.log")
+    # SIGINT of Ctrl+C reaches this process only, the command runs in its own session
+    timer = threading.Timer(1, os.kill, (os.getpid(), signal.SIGINT))
+    timer.start()
+    try:
+        with pytest.raises(KeyboardInterrupt):
+            run_shell_to_file(LONG_RUNNING, log_path, stop=threading.Event())
+    finally:
+        timer.cancel()
+
+    with open(log_path) as f:
+        pgid = int(f.readline())
+    assert not group_alive(pgid)
+
+
+def test_interrupt_commands_on_error_stops_worker_commands(tmp_path):
+    log_path = str(tmp_path / "scenario.log")
+    start = time.monotonic()
+    with pytest.raises(KeyboardInterrupt):
+        with ThreadPoolExecutor(max_workers=1) as executor, interrupt_commands_on_error():
+            future = executor.submit(run_shell_to_file, LONG_RUNNING, log_path, stop=threading.Event())
+            pgid = running_pgid()
+            raise KeyboardInterrupt()
+
+    # Worker was not waited for until the command finished by itself
+    assert time.monotonic() - start < 30
+    assert future.done()
+    assert not group_alive(pgid)